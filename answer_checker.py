@@ -0,0 +1,266 @@
+import ast
+import math
+import operator
+import re
+import sys
+import time
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Relative tolerance when comparing non-integer results (explanations often round, e.g. "≈ 42.4")
+REL_TOLERANCE = 5e-3
+
+# Largest exponent the evaluator will compute
+MAX_EXPONENT = 100
+
+# Largest number of decimal digits a power may have, so nested powers cannot run away
+MAX_POWER_DIGITS = 300
+
+# Check outcomes
+OK = "ok"
+MISMATCH = "mismatch"
+UNCHECKED = "unchecked"
+
+# LaTeX and typographic notation rewritten before evaluation
+_LATEX_FRAC = re.compile(r"\\[dt]?frac\s*\{([^{}]*)\}\s*\{([^{}]*)\}")
+_LATEX_SQRT = re.compile(r"\\sqrt\s*\{([^{}]*)\}")
+_REPLACEMENTS = (
+    ("\\left", ""), ("\\right", ""), ("\\times", "×"), ("\\cdot", "×"), ("\\div", "÷"), ("\\pi", "π"),
+    ("\\approx", "≈"), ("\\,", ""), ("\\(", ""), ("\\)", ""), ("\\[", ""), ("\\]", ""), ("$", ""),
+    ("{", "("), ("}", ")"), ("−", "-"), ("–", "-"), ("·", "×"), ("⋅", "×"), ("°", ""),
+)
+_SUPERSCRIPTS = str.maketrans({"⁰": "0", "¹": "1", "²": "2", "³": "3", "⁴": "4", "⁵": "5",
+                               "⁶": "6", "⁷": "7", "⁸": "8", "⁹": "9"})
+
+# A plain number, optionally followed by words such as a unit (the common case, evaluated without ast)
+_PLAIN_NUMBER = re.compile(r"\s*(-?\d+(?:\.\d+)?)(?:\s+[^\d\s+\-×*/÷^()π√%⁰¹²³⁴⁵⁶⁷⁸⁹][^\d+\-×*/÷^()π√%⁰¹²³⁴⁵⁶⁷⁸⁹]*)?\s*")
+
+# Leading run of characters that can form an arithmetic expression
+_MATH_PREFIX = re.compile(r"[\d\s.,+\-×*/÷^()π√%⁰¹²³⁴⁵⁶⁷⁸⁹]+")
+_UNIT_SUFFIX = re.compile(r"(?:mm|cm|km|m|in|ft|yd|mi|kg|mg|g|lb|oz|ml|l|s|sec|min|h|hr|hrs)(?:[²³]|\^\d)?\b")
+_BARE_ROOT = re.compile(r"√(\d+(?:\.\d+)?)")
+_SUPERSCRIPT_RUN = re.compile(r"[⁰¹²³⁴⁵⁶⁷⁸⁹]+")
+_THOUSANDS = re.compile(r"(?<=\d),(?=\d{3}(?!\d))")
+_MIXED_NUMBER = re.compile(r"(\d+)\s+(\d+)\s*/\s*(\d+)")
+_IMPLICIT_PRODUCT = re.compile(r"(?<=[\dπ)])\s*(?=[(π√])|(?<=[)π])\s*(?=\d)")
+
+# Right-hand sides of "=" / "≈" in an explanation, up to the end of the clause
+_RESULT = re.compile(r"[=≈]\s*([^=≈]*?)(?=[=≈]|[,;:]\s|\.(?:\s|$)|\n|$)")
+
+# Start of a verification step that follows the answer in an explanation
+_CHECK_STEP = re.compile(r"\b(?:check|checking|verify|verifying|verification)\b", re.IGNORECASE)
+
+# Answers holding more than one quantity: ratios, "a × b × c" dimensions, and
+# numbers separated by words or list punctuation ("2 hours 30 minutes", "(3, 4)")
+_RATIO = re.compile(r"\d\s*:\s*\d")
+_TUPLE = re.compile(r"[\d)]\s*(?:×|\*|\bx\b|\bby\b)\s*\(?\s*\d(?![\d.]*\s*(?:\^|\*\*|[⁰¹²³⁴⁵⁶⁷⁸⁹]))")
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+_QUANTITY_SEPARATOR = re.compile(r"[A-Za-z]{2,}|[,;&]")
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.Pow: operator.pow,
+}
+_UNARY_OPERATORS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+_NAMES = {"pi": math.pi}
+
+def _evaluate_node(node: ast.AST) -> float:
+    if isinstance(node, ast.Expression):
+        return _evaluate_node(node.body)
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        left = _evaluate_node(node.left)
+        right = _evaluate_node(node.right)
+        if isinstance(node.op, ast.Pow):
+            if abs(right) > MAX_EXPONENT:
+                raise ValueError("exponent too large")
+            if abs(left) > 1 and abs(right) * math.log10(abs(left)) > MAX_POWER_DIGITS:
+                raise ValueError("power too large")
+        return _BINARY_OPERATORS[type(node.op)](left, right)
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        return _UNARY_OPERATORS[type(node.op)](_evaluate_node(node.operand))
+    if isinstance(node, ast.Name) and node.id in _NAMES:
+        return _NAMES[node.id]
+    if (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "sqrt"
+            and len(node.args) == 1 and not node.keywords):
+        return math.sqrt(_evaluate_node(node.args[0]))
+    raise ValueError(f"unsupported expression: {type(node).__name__}")
+
+def _to_python(text: str) -> Optional[str]:
+    """Rewrite the leading arithmetic of text as a Python expression, or None if there is none."""
+    text = _normalize_latex(text)
+    match = _MATH_PREFIX.match(text.strip())
+    if match is None:
+        return None
+    expression = match.group()
+    rest = text.strip()[match.end():]
+    # "3x" or "5y + 2" is algebra, not a number with a unit
+    if rest[:1].isalpha() and not expression[-1:].isspace() and not _UNIT_SUFFIX.match(rest):
+        return None
+    expression = _THOUSANDS.sub("", expression.strip().rstrip(".,"))
+    if not any(char.isdigit() or char == "π" for char in expression):
+        return None
+    expression = _MIXED_NUMBER.sub(r"(\1+\2/\3)", expression)
+    expression = _SUPERSCRIPT_RUN.sub(lambda m: "^" + m.group().translate(_SUPERSCRIPTS), expression)
+    expression = _IMPLICIT_PRODUCT.sub("×", expression)
+    expression = expression.replace("√(", "sqrt(")
+    expression = _BARE_ROOT.sub(r"sqrt(\1)", expression)
+    return (expression.replace("×", "*").replace("÷", "/").replace("^", "**")
+            .replace("π", "pi").replace("%", "/100"))
+
+@lru_cache(maxsize=65536)
+def evaluate(text: str) -> Optional[float]:
+    """
+    Evaluate the arithmetic at the start of text, ignoring trailing units or words.
+
+    Supports + - × ÷ * / ^, superscript powers, parentheses, implicit
+    multiplication ("13.5π", "π(1.5)²(6)"), π, √, percentages, mixed numbers,
+    thousands separators and simple LaTeX (\\frac, \\sqrt, \\pi, \\times, \\cdot).
+    The expression is parsed with ast and only arithmetic nodes are evaluated,
+    so arbitrary code can never run.
+
+    Args:
+        text: Text such as "54π cubic cm" or "\\frac{3}{4}"
+
+    Returns:
+        The value, or None if text does not start with a numeric expression
+    """
+    plain = _PLAIN_NUMBER.fullmatch(text)
+    if plain is not None:
+        return float(plain.group(1))
+    expression = _to_python(text)
+    if expression is None:
+        return None
+    try:
+        value = _evaluate_node(ast.parse(expression, mode="eval"))
+        if isinstance(value, complex):
+            return None
+        value = float(value)
+    except (SyntaxError, ValueError, TypeError, ZeroDivisionError, OverflowError, RecursionError):
+        return None
+    return value if math.isfinite(value) else None
+
+def _normalize_latex(text: str) -> str:
+    text = _LATEX_SQRT.sub(r"√(\1)", _LATEX_FRAC.sub(r"((\1)/(\2))", text))
+    for old, new in _REPLACEMENTS:
+        text = text.replace(old, new)
+    return text
+
+def has_several_quantities(text: str) -> bool:
+    """Return True if an answer holds more than one quantity (a ratio, dimensions, a pair, a time)."""
+    if _PLAIN_NUMBER.fullmatch(text):
+        return False
+    text = _THOUSANDS.sub("", _normalize_latex(text))
+    if _RATIO.search(text) or _TUPLE.search(text):
+        return True
+    numbers = list(_NUMBER.finditer(text))
+    for previous, number in zip(numbers, numbers[1:]):
+        between = text[previous.end():number.start()]
+        # "cm^2" is a unit with an exponent, not a second quantity
+        if _QUANTITY_SEPARATOR.search(between) and not between.rstrip().endswith("^"):
+            return True
+    return False
+
+def explanation_results(explanation: str) -> List[float]:
+    """Return the values of every "= ..." / "≈ ..." result in an explanation, in order."""
+    values = []
+    for match in _RESULT.finditer(explanation):
+        value = evaluate(match.group(1).strip())
+        if value is not None:
+            values.append(value)
+    return values
+
+def _close(a: float, b: float) -> bool:
+    # Whole numbers must match exactly; only fractional results may be rounded
+    if a.is_integer() and b.is_integer():
+        return a == b
+    return math.isclose(a, b, rel_tol=REL_TOLERANCE, abs_tol=1e-9)
+
+def check_answer(question: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Check a question's correct_option against the result computed in its explanation.
+
+    The question passes if the final result in the explanation equals the
+    value of correct_option; earlier results are only used when later ones
+    cannot be evaluated, and a trailing check/verification step is ignored.
+    It is a mismatch only when that result contradicts a single numeric
+    answer: the question is unchecked when either side is not numeric (e.g.
+    algebraic options), when correct_option holds several quantities (ratios,
+    dimensions, "2 hours 30 minutes") or when the final result matches no
+    option but an earlier step does match correct_option.
+
+    Args:
+        question: Question object
+
+    Returns:
+        (OK, MISMATCH or UNCHECKED, human-readable detail)
+    """
+    correct = question.get("correct_option")
+    expected = evaluate(correct) if isinstance(correct, str) else None
+    if expected is None:
+        return UNCHECKED, "correct_option is not numeric"
+    if has_several_quantities(correct):
+        return UNCHECKED, "correct_option holds several quantities"
+    explanation = question.get("explanation")
+    if not isinstance(explanation, str):
+        return UNCHECKED, "no numeric result in the explanation"
+    # Leave out a verification step after the answer ("Check: 2(5) + 3 = 13")
+    check_step = _CHECK_STEP.search(explanation)
+    results = explanation_results(explanation[:check_step.start()]) if check_step else []
+    if not results:
+        results = explanation_results(explanation)
+    if not results:
+        return UNCHECKED, "no numeric result in the explanation"
+    final = results[-1]
+    if _close(final, expected):
+        return OK, ""
+
+    matching_option = None
+    for option in question.get("options") or ():
+        value = evaluate(option) if isinstance(option, str) else None
+        if value is not None and _close(value, final):
+            matching_option = option
+            break
+    if matching_option is None and any(_close(value, expected) for value in results):
+        return UNCHECKED, "the final result matches no option but an earlier step matches correct_option"
+    detail = f"explanation computes {final:g} but correct_option {correct!r} is {expected:g}"
+    if matching_option is not None:
+        detail += f"; the explanation matches option {matching_option!r}"
+    return MISMATCH, detail
+
+def main():
+    import argparse
+    import os
+    from question_loader import QuestionLoader
+
+    parser = argparse.ArgumentParser(description="Check that each question's correct_option matches the result computed in its explanation.")
+    parser.add_argument('files', nargs='+', help='Question files (.json or .jsonl)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Only print the summary')
+    args = parser.parse_args()
+
+    counts = {OK: 0, MISMATCH: 0, UNCHECKED: 0}
+    start_time = time.perf_counter()
+    for questions_file in args.files:
+        if not os.path.exists(questions_file):
+            print(f"Error: File '{questions_file}' not found.")
+            sys.exit(2)
+        try:
+            for number, question in enumerate(QuestionLoader(questions_file), 1):
+                status, detail = check_answer(question) if isinstance(question, dict) else (UNCHECKED, "")
+                counts[status] += 1
+                if status == MISMATCH and not args.quiet:
+                    print(f"{questions_file}: question {number}: {detail}")
+        except ValueError as e:
+            print(f"Error: File '{questions_file}' is not a valid JSON or JSON Lines file: {e}")
+            sys.exit(2)
+    elapsed = time.perf_counter() - start_time
+
+    total = sum(counts.values())
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"Checked {total} questions in {elapsed:.2f}s ({rate:.0f} questions/s): "
+          f"{counts[OK]} ok, {counts[MISMATCH]} mismatched, {counts[UNCHECKED]} unchecked.")
+    sys.exit(1 if counts[MISMATCH] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List
+
+from fake_model import FakeGenerativeModel, make_fake_question
+from mcq_generator import generate_image_prompt, iter_questions_concurrently, parse_questions_response
+from question_writer import JsonlWriter
+from resilience import CircuitBreaker, ResilientCaller
+
+class TimedModel:
+    """Wrap a model and record the latency of every generate_content call."""
+
+    def __init__(self, model):
+        self.model = model
+        self.model_name = model.model_name
+        self.latencies: List[float] = []
+
+    def generate_content(self, prompt: str, **kwargs: Any):
+        start = time.perf_counter()
+        try:
+            return self.model.generate_content(prompt, **kwargs)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    """Return p50/p95/p99 of values in milliseconds (nearest rank)."""
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    ordered = sorted(values)
+    def rank(p):
+        return round(ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))] * 1000, 3)
+    return {"p50": rank(50), "p95": rank(95), "p99": rank(99)}
+
+def measure(func: Callable[[], int], track_memory: bool) -> Dict[str, Any]:
+    """Run func (which returns the number of items processed) and return throughput and peak memory."""
+    if track_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    peak = 0
+    if track_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return {
+        "items": count,
+        "seconds": round(elapsed, 4),
+        "items_per_sec": round(count / elapsed, 1) if elapsed > 0 else 0.0,
+        "peak_memory_kb": round(peak / 1024, 1),
+    }
+
+def make_model(args, seed: int) -> FakeGenerativeModel:
+    return FakeGenerativeModel(latency=args.latency_ms / 1000, latency_sigma=args.latency_sigma,
+                               error_rate=args.error_rate, response_size=args.response_size, seed=seed)
+
+def make_resilience() -> ResilientCaller:
+    # Short backoff so simulated errors exercise retries without dominating the run
+    return ResilientCaller(max_attempts=5, base_delay=0.01, max_delay=0.1,
+                           breaker=CircuitBreaker(cooldown=0.1))
+
+def bench_pipeline(args, workers: int, batch_size: int, output_dir: str) -> Dict[str, Any]:
+    """Generation (model call, parsing, validation) plus JSON Lines output."""
+    model = TimedModel(make_model(args, args.seed))
+    resilience = make_resilience()
+    path = os.path.join(output_dir, f"pipeline_{workers}_{batch_size}.jsonl")
+
+    def run() -> int:
+        writer = JsonlWriter(path, fsync_every=args.fsync_every)
+        count = 0
+        for question in iter_questions_concurrently([BASE, BASE], args.questions, workers=workers,
+                                                    batch_size=batch_size, model=model, resilience=resilience):
+            writer.write(question)
+            count += 1
+        writer.close()
+        return count
+
+    result = measure(run, args.memory)
+    result.update({
+        "stage": "pipeline",
+        "workers": workers,
+        "batch_size": batch_size,
+        "model_calls": len(model.latencies),
+        "retries": resilience.retries,
+        "call_latency_ms": percentiles(model.latencies),
+    })
+    return result
+
+def bench_parse(args) -> Dict[str, Any]:
+    """Response parsing and validation only (no model latency)."""
+    rng = random.Random(args.seed)
+    responses = [json.dumps([make_fake_question(rng, args.response_size) for _ in range(args.parse_batch)])
+                 for _ in range(max(1, args.questions // args.parse_batch))]
+    latencies = []
+
+    def run() -> int:
+        count = 0
+        for text in responses:
+            start = time.perf_counter()
+            count += len(parse_questions_response(text))
+            latencies.append(time.perf_counter() - start)
+        return count
+
+    result = measure(run, args.memory)
+    result.update({"stage": "parse", "batch_size": args.parse_batch, "call_latency_ms": percentiles(latencies)})
+    return result
+
+def bench_image_prompt(args, workers: int) -> Dict[str, Any]:
+    """generate_image_prompt for questions that have an image prompt."""
+    rng = random.Random(args.seed)
+    questions = [make_fake_question(rng) for _ in range(args.questions)]
+    questions = [q for q in questions if q["image_prompt"]]
+    model = TimedModel(make_model(args, args.seed + 1))
+    resilience = make_resilience()
+
+    def run() -> int:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return sum(1 for _ in executor.map(
+                lambda q: generate_image_prompt(q, model=model, resilience=resilience), questions))
+
+    result = measure(run, args.memory)
+    result.update({"stage": "image_prompt", "workers": workers, "model_calls": len(model.latencies),
+                   "call_latency_ms": percentiles(model.latencies)})
+    return result
+
+def bench_write(args, output_dir: str) -> Dict[str, Any]:
+    """JSON Lines output writing."""
+    rng = random.Random(args.seed)
+    questions = [make_fake_question(rng, args.response_size) for _ in range(args.questions)]
+    path = os.path.join(output_dir, "write.jsonl")
+
+    def run() -> int:
+        writer = JsonlWriter(path, fsync_every=args.fsync_every)
+        for question in questions:
+            writer.write(question)
+        writer.close()
+        return len(questions)
+
+    result = measure(run, args.memory)
+    result.update({"stage": "write", "fsync_every": args.fsync_every})
+    return result
+
+# Base question given to the engine; the fake model ignores its content
+BASE = "What is 2 + 2? (A) 3 (B) 4 (C) 5 (D) 6"
+
+def parse_int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",") if part]
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Benchmark the MCQ generation pipeline against a local fake model.')
+    parser.add_argument('-n', '--questions', type=int, default=200, help='Questions per scenario (default: 200)')
+    parser.add_argument('-w', '--workers', type=parse_int_list, default=[1, 4, 16], help='Comma-separated worker counts (default: 1,4,16)')
+    parser.add_argument('-b', '--batch-sizes', type=parse_int_list, default=[1, 5], help='Comma-separated batch sizes (default: 1,5)')
+    parser.add_argument('--latency-ms', type=float, default=50, help='Median fake model latency in ms (default: 50)')
+    parser.add_argument('--latency-sigma', type=float, default=0.5, help='Log-normal latency spread (default: 0.5)')
+    parser.add_argument('--error-rate', type=float, default=0.02, help='Fraction of fake calls that fail transiently (default: 0.02)')
+    parser.add_argument('--response-size', type=int, default=1500, help='Approximate characters per generated question (default: 1500)')
+    parser.add_argument('--parse-batch', type=int, default=5, help='Questions per response in the parse benchmark (default: 5)')
+    parser.add_argument('--fsync-every', type=int, default=10, help='Questions between fsyncs when writing (default: 10)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    parser.add_argument('--no-memory', dest='memory', action='store_false', help='Skip peak memory tracking (tracemalloc slows CPU-bound stages)')
+    parser.add_argument('-o', '--output', type=str, default=None, help='Write JSON results to this file (default: stdout)')
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for workers in args.workers:
+            for batch_size in args.batch_sizes:
+                results.append(bench_pipeline(args, workers, batch_size, output_dir))
+        results.append(bench_parse(args))
+        for workers in args.workers:
+            results.append(bench_image_prompt(args, workers))
+        results.append(bench_write(args, output_dir))
+
+    for result in results:
+        details = ", ".join(f"{key}={result[key]}" for key in ("workers", "batch_size") if key in result)
+        latency = result.get("call_latency_ms")
+        latency_text = f", p50/p95/p99 {latency['p50']}/{latency['p95']}/{latency['p99']} ms" if latency else ""
+        print(f"{result['stage']:<13} {details:<24} {result['items_per_sec']:>10.1f} items/s"
+              f"{latency_text}, peak {result['peak_memory_kb']} KB", file=sys.stderr)
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": {key: value for key, value in vars(args).items() if key != "output"},
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}", file=sys.stderr)
+    else:
+        print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+import json
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from curriculum import ALLOWED_CURRICULUM, CURRICULUM_SEPARATOR, CURRICULUM_SET
+from question_validator import DIFFICULTIES, DIFFICULTY_LEVELS
+
+# Plan key whose difficulty counts apply to every curriculum entry not listed explicitly
+PLAN_DEFAULT_KEY = "*"
+
+# A bucket is a (curriculum entry, difficulty) pair
+Bucket = Tuple[str, str]
+
+def load_plan(path: str) -> Dict[Bucket, int]:
+    """
+    Read a coverage plan of target question counts.
+
+    The plan is a JSON object mapping curriculum entries (exactly as in
+    ALLOWED_CURRICULUM) to objects of difficulty -> count, e.g.
+
+        {
+          "*": {"easy": 2, "moderate": 2},
+          "Quantitative Math -> Algebra -> Rational Expressions": {"easy": 10, "hard": 5}
+        }
+
+    The "*" entry applies to every curriculum entry that is not listed.
+
+    Args:
+        path: Path of the JSON plan file
+
+    Returns:
+        Target count per (curriculum entry, difficulty), in curriculum order
+
+    Raises:
+        ValueError: If the plan names an unknown curriculum entry or difficulty
+    """
+    with open(path, 'r') as f:
+        plan = json.load(f)
+    if not isinstance(plan, dict):
+        raise ValueError("Plan must be a JSON object mapping curriculum entries to difficulty counts")
+
+    for entry, counts in plan.items():
+        if entry != PLAN_DEFAULT_KEY and tuple(entry.split(CURRICULUM_SEPARATOR)) not in CURRICULUM_SET:
+            raise ValueError(f"Unknown curriculum entry in plan: {entry!r}")
+        if not isinstance(counts, dict):
+            raise ValueError(f"Counts for {entry!r} must be an object of difficulty -> count")
+        for difficulty, count in counts.items():
+            if difficulty not in DIFFICULTIES:
+                raise ValueError(f"Unknown difficulty {difficulty!r} for {entry!r}")
+            if not isinstance(count, int) or count < 0:
+                raise ValueError(f"Count for {entry!r} ({difficulty}) must be a non-negative integer")
+
+    targets = {}
+    default = plan.get(PLAN_DEFAULT_KEY, {})
+    for entry in ALLOWED_CURRICULUM:
+        counts = plan.get(entry, default)
+        for difficulty in DIFFICULTY_LEVELS:
+            if counts.get(difficulty):
+                targets[(entry, difficulty)] = counts[difficulty]
+    return targets
+
+def question_bucket(question: Dict[str, Any]) -> Bucket:
+    """Return the (curriculum entry, difficulty) bucket a question belongs to."""
+    entry = CURRICULUM_SEPARATOR.join((question.get("subject", ""), question.get("unit", ""), question.get("topic", "")))
+    return entry, question.get("difficulty", "")
+
+class CurriculumScheduler:
+    """
+    Track coverage quotas and decide which topic and difficulty to request next.
+
+    Every request is for the bucket with the most unfilled, not-yet-requested
+    slots, so concurrent workers spread over the plan instead of piling onto
+    one topic. Questions are credited to the bucket they actually belong to:
+    one that drifts to a different topic or difficulty still counts if that
+    bucket has room, and is rejected only if it is off-plan or over quota.
+    Filled buckets are never requested again, and a bucket whose requests keep
+    coming back empty is abandoned after max_failures calls in a row.
+
+    Args:
+        targets: Target count per (curriculum entry, difficulty), as returned by load_plan
+        max_failures: Consecutive calls without an accepted question before a bucket is abandoned
+    """
+
+    def __init__(self, targets: Dict[Bucket, int], max_failures: int = 3):
+        self.targets = dict(targets)
+        self.max_failures = max_failures
+        self.accepted = {bucket: 0 for bucket in self.targets}
+        self.calls = {bucket: 0 for bucket in self.targets}
+        self.rejected = 0
+        self.abandoned: List[Bucket] = []
+        self._in_flight = {bucket: 0 for bucket in self.targets}
+        self._failures = {bucket: 0 for bucket in self.targets}
+        self._lock = threading.Lock()
+
+    def _open(self, bucket: Bucket) -> int:
+        return self.targets[bucket] - self.accepted[bucket] - self._in_flight[bucket]
+
+    def next_request(self, batch_size: int = 1) -> Optional[Tuple[Bucket, int, int]]:
+        """
+        Reserve the next request.
+
+        Args:
+            batch_size: Maximum number of questions per request
+
+        Returns:
+            (bucket, number of questions, call number for this bucket), or None
+            if every bucket is filled, abandoned or already fully requested
+        """
+        with self._lock:
+            best = None
+            for bucket in self.targets:
+                if bucket in self.abandoned:
+                    continue
+                open_slots = self._open(bucket)
+                if open_slots > 0 and (best is None or open_slots > self._open(best)):
+                    best = bucket
+            if best is None:
+                return None
+            count = min(max(1, batch_size), self._open(best))
+            self._in_flight[best] += count
+            call = self.calls[best]
+            self.calls[best] += 1
+            return best, count, call
+
+    def claim(self, question: Dict[str, Any]) -> bool:
+        """Credit a question to its bucket; return False if it is off-plan or the bucket is full."""
+        bucket = question_bucket(question)
+        with self._lock:
+            if bucket not in self.targets or self.accepted[bucket] >= self.targets[bucket]:
+                self.rejected += 1
+                return False
+            self.accepted[bucket] += 1
+            return True
+
+    def unclaim(self, question: Dict[str, Any]) -> None:
+        """Undo claim() for a question that was rejected afterwards (e.g. as a duplicate)."""
+        bucket = question_bucket(question)
+        with self._lock:
+            self.accepted[bucket] -= 1
+            self.rejected += 1
+
+    def complete(self, bucket: Bucket, requested: int, accepted: int) -> None:
+        """
+        Release a request reserved with next_request.
+
+        Args:
+            bucket: Bucket the request was for
+            requested: Number of questions reserved
+            accepted: Number of returned questions credited to that bucket
+        """
+        with self._lock:
+            self._in_flight[bucket] -= requested
+            if accepted:
+                self._failures[bucket] = 0
+                return
+            self._failures[bucket] += 1
+            if self._failures[bucket] >= self.max_failures and bucket not in self.abandoned:
+                self.abandoned.append(bucket)
+                print(f"Giving up on {bucket[0]} ({bucket[1]}) after {self.max_failures} calls without a usable question")
+
+    def count_existing(self, questions: Iterable[Dict[str, Any]]) -> int:
+        """Credit already generated questions (e.g. when resuming); return how many counted."""
+        return sum(1 for question in questions if self.claim(question))
+
+    @property
+    def total_target(self) -> int:
+        return sum(self.targets.values())
+
+    @property
+    def total_accepted(self) -> int:
+        return sum(self.accepted.values())
+
+    def report(self) -> str:
+        """Return a coverage table of accepted/target counts per bucket."""
+        lines = [f"{'curriculum':<70}{'difficulty':>10}{'done':>6}{'target':>8}{'calls':>7}"]
+        for (entry, difficulty), target in self.targets.items():
+            bucket = (entry, difficulty)
+            note = "  abandoned" if bucket in self.abandoned else ""
+            lines.append(f"{entry[-70:]:<70}{difficulty:>10}{self.accepted[bucket]:>6}{target:>8}"
+                         f"{self.calls[bucket]:>7}{note}")
+        lines.append(f"Total: {self.total_accepted}/{self.total_target} questions, "
+                     f"{sum(self.calls.values())} calls, {self.rejected} off-plan, over-quota or duplicate questions rejected")
+        return "\n".join(lines)
@@ -0,0 +1,240 @@
+import hashlib
+import re
+import sqlite3
+import struct
+import threading
+import unicodedata
+from array import array
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Anything that is not a letter, digit or common math symbol separates words
+_SEPARATORS = re.compile(r"[^\wπ+\-*/=^%.×÷√]+")
+
+# Default location of the persistent index
+DEFAULT_DEDUP_INDEX = "question_index.sqlite3"
+
+def normalize_question_text(question: Dict[str, Any]) -> List[str]:
+    """
+    Return the normalised words of a question's text followed by its options.
+
+    Options are sorted so that reordering them does not hide a duplicate.
+    """
+    parts = [question.get("question", "")] + sorted(str(option) for option in question.get("options", []))
+    text = unicodedata.normalize("NFKC", " ".join(parts)).lower()
+    return [word for word in _SEPARATORS.split(text) if word]
+
+class DuplicateIndex:
+    """
+    Persistent near-duplicate index over question text and options.
+
+    Each question is reduced to a MinHash signature of its word 3-grams: every
+    shingle's num_perm hash values come from one SHAKE-128 digest and the
+    signature is their element-wise minimum. The signature is split into bands
+    and every band is stored as a single hashed key in an indexed SQLite table
+    (locality-sensitive hashing), so a lookup is one indexed query for the band
+    keys plus a signature comparison for the few candidates that share a band,
+    independent of how many questions are stored.
+
+    During generation, questions are first reserved in memory (reserve) and
+    only stored once they have been written out (add), so questions that never
+    reach the output do not linger in the index. Reserved questions are
+    checked alongside stored ones, so concurrent workers cannot both accept
+    the same question.
+
+    Args:
+        path: SQLite database file holding the index
+        threshold: Estimated Jaccard similarity at or above which a question is a duplicate
+        num_perm: Number of MinHash permutations
+        bands: Number of LSH bands (must divide num_perm)
+    """
+
+    def __init__(self, path: str = DEFAULT_DEDUP_INDEX, threshold: float = 0.8,
+                 num_perm: int = 64, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.path = path
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.duplicates = 0
+        self._band_struct = struct.Struct(f"<I{self.rows}I")
+        self._lock = threading.Lock()
+        # Signatures reserved in this run but not yet stored, and their band keys
+        self._reserved: Dict[bytes, List[int]] = {}
+        self._reserved_bands: Dict[int, Set[bytes]] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions (id INTEGER PRIMARY KEY, signature BLOB NOT NULL, question TEXT)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS bands (key INTEGER NOT NULL, id INTEGER NOT NULL)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS bands_key ON bands (key)")
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+    def signature(self, question: Dict[str, Any]) -> List[int]:
+        """Return the MinHash signature of a question."""
+        words = normalize_question_text(question)
+        if len(words) >= 3:
+            shingles = {" ".join(words[i:i + 3]) for i in range(len(words) - 2)}
+        else:
+            shingles = {" ".join(words)}
+        digest_size = 4 * self.num_perm
+        hashes = [array("I", hashlib.shake_128(shingle.encode("utf-8")).digest(digest_size)) for shingle in shingles]
+        return list(map(min, *hashes)) if len(hashes) > 1 else list(hashes[0])
+
+    def _band_keys(self, signature: List[int]) -> List[int]:
+        keys = []
+        for band in range(self.bands):
+            packed = self._band_struct.pack(band, *signature[band * self.rows:(band + 1) * self.rows])
+            # SQLite integers are signed 64-bit
+            keys.append(int.from_bytes(hashlib.blake2b(packed, digest_size=8).digest(), "little", signed=True))
+        return keys
+
+    def _best_match(self, signature: List[int], keys: List[int]) -> Optional[Tuple[int, float]]:
+        placeholders = ",".join("?" * len(keys))
+        rows = self._conn.execute(
+            f"SELECT id, signature FROM questions WHERE id IN "
+            f"(SELECT DISTINCT id FROM bands WHERE key IN ({placeholders}))", keys
+        ).fetchall()
+        best = None
+        for question_id, blob in rows:
+            stored = array("I", blob)
+            similarity = sum(1 for x, y in zip(signature, stored) if x == y) / self.num_perm
+            if best is None or similarity > best[1]:
+                best = (question_id, similarity)
+        return best
+
+    def _best_reserved(self, signature: List[int], keys: List[int]) -> Optional[Tuple[None, float]]:
+        best = None
+        candidates = set()
+        for key in keys:
+            candidates.update(self._reserved_bands.get(key, ()))
+        for blob in candidates:
+            stored = array("I", blob)
+            similarity = sum(1 for x, y in zip(signature, stored) if x == y) / self.num_perm
+            if best is None or similarity > best[1]:
+                best = (None, similarity)
+        return best
+
+    def _insert(self, signature: List[int], keys: List[int], question: Dict[str, Any]) -> None:
+        cursor = self._conn.execute(
+            "INSERT INTO questions (signature, question) VALUES (?, ?)",
+            (array("I", signature).tobytes(), question.get("question", ""))
+        )
+        self._conn.executemany("INSERT INTO bands (key, id) VALUES (?, ?)",
+                               [(key, cursor.lastrowid) for key in keys])
+        self._conn.commit()
+
+    def _unreserve(self, blob: bytes) -> None:
+        for key in self._reserved.pop(blob, ()):
+            blobs = self._reserved_bands[key]
+            blobs.discard(blob)
+            if not blobs:
+                del self._reserved_bands[key]
+
+    def find_duplicate(self, question: Dict[str, Any]) -> Optional[Tuple[int, float]]:
+        """
+        Look up the most similar stored question.
+
+        Returns:
+            (id, estimated similarity) of the closest stored question at or above
+            the threshold, or None if the question is new
+        """
+        signature = self.signature(question)
+        keys = self._band_keys(signature)
+        with self._lock:
+            match = self._best_match(signature, keys)
+        if match is not None and match[1] >= self.threshold:
+            return match
+        return None
+
+    def add_if_new(self, question: Dict[str, Any]) -> Optional[Tuple[int, float]]:
+        """
+        Store a question unless it duplicates one already in the index.
+
+        The lookup and insert happen atomically, so concurrent workers cannot
+        both accept the same question.
+
+        Returns:
+            None if the question was added, otherwise (id, similarity) of the duplicate
+        """
+        signature = self.signature(question)
+        keys = self._band_keys(signature)
+        with self._lock:
+            match = self._best_match(signature, keys)
+            if match is not None and match[1] >= self.threshold:
+                self.duplicates += 1
+                return match
+            self._insert(signature, keys, question)
+        return None
+
+    def reserve(self, question: Dict[str, Any]) -> Optional[Tuple[Optional[int], float]]:
+        """
+        Reserve a question in memory unless it duplicates a stored or reserved one.
+
+        The lookup and reservation happen atomically. Call add once the question
+        has been written out; reservations themselves are never persisted.
+
+        Returns:
+            None if the question was reserved, otherwise (id, similarity) of the
+            duplicate (id is None for a question reserved in this run)
+        """
+        signature = self.signature(question)
+        keys = self._band_keys(signature)
+        blob = array("I", signature).tobytes()
+        with self._lock:
+            match = self._best_match(signature, keys)
+            reserved = self._best_reserved(signature, keys)
+            if reserved is not None and (match is None or reserved[1] > match[1]):
+                match = reserved
+            if match is not None and match[1] >= self.threshold:
+                self.duplicates += 1
+                return match
+            self._reserved[blob] = keys
+            for key in keys:
+                self._reserved_bands.setdefault(key, set()).add(blob)
+        return None
+
+    def add(self, question: Dict[str, Any]) -> None:
+        """Store a question (typically a reserved one, once it has been written out)."""
+        signature = self.signature(question)
+        keys = self._band_keys(signature)
+        with self._lock:
+            self._unreserve(array("I", signature).tobytes())
+            self._insert(signature, keys, question)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+def main():
+    import argparse
+    from question_loader import QuestionLoader
+
+    parser = argparse.ArgumentParser(description='Add existing question files to the near-duplicate index and report duplicates.')
+    parser.add_argument('files', nargs='+', help='Question files (.json or .jsonl)')
+    parser.add_argument('--index', type=str, default=DEFAULT_DEDUP_INDEX, help=f'Index database path (default: {DEFAULT_DEDUP_INDEX})')
+    parser.add_argument('--threshold', type=float, default=0.8, help='Similarity threshold for duplicates (default: 0.8)')
+    args = parser.parse_args()
+
+    index = DuplicateIndex(args.index, threshold=args.threshold)
+    added = 0
+    for questions_file in args.files:
+        for number, question in enumerate(QuestionLoader(questions_file), 1):
+            match = index.add_if_new(question)
+            if match is None:
+                added += 1
+            else:
+                print(f"{questions_file}: question {number} duplicates stored question {match[0]} (similarity {match[1]:.2f})")
+    print(f"Added {added} questions, found {index.duplicates} duplicates. Index now holds {len(index)} questions.")
+    index.close()
+
+if __name__ == "__main__":
+    main()
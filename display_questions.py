@@ -1,82 +1,106 @@
 import json
 import os
-import sys
+from question import Question
+from question_loader import QuestionLoader
+from question_bank import QuestionBank, add_query_arguments, query_filters
 
 def display_question(question, question_number=1):
     """
     Display a math question in a formatted way.
     
     Args:
-        question: The question object
+        question: The question object (a dict or a Question)
         question_number: The question number to display
     """
+    if not isinstance(question, Question):
+        question = Question.from_dict(question)
+    
     print(f"\n{'='*50}")
-    print(f"Question {question_number}: {question['question']}")
+    print(f"Question {question_number}: {question.question}")
     print(f"{'='*50}")
     
-    print("Instructions:", question['instruction'])
-    print(f"Difficulty: {question['difficulty']}\n")
+    print("Instructions:", question.instruction)
+    print(f"Difficulty: {question.difficulty}\n")
     
     # Display options
-    for i, option in enumerate(question['options']):
+    for i, option in enumerate(question.options):
         option_letter = chr(65 + i)  # A, B, C, D, E...
         print(f"({option_letter}) {option}")
     
     print("\nPress Enter to see the answer...")
     input()
     
-    # Find the correct option letter
-    correct_option_index = question['options'].index(question['correct_option'])
-    correct_option_letter = chr(65 + correct_option_index)
+    # The correct option letter is precomputed when the question is loaded
+    correct_option_letter = question.correct_letter or "?"
     
-    print(f"\nCorrect Answer: ({correct_option_letter}) {question['correct_option']}")
-    print(f"\nExplanation: {question['explanation']}")
+    print(f"\nCorrect Answer: ({correct_option_letter}) {question.correct_option}")
+    print(f"\nExplanation: {question.explanation}")
     
     # Display image information
-    if question.get('image_prompt') and question.get('image_alt'):
-        print(f"\nImage Description: {question['image_alt']}")
+    if question.image_prompt and question.image_alt:
+        print(f"\nImage Description: {question.image_alt}")
         print("(Note: This question includes an image prompt that could be used to generate an actual image)")
     else:
         print("\n(This question does not include an image)")
 
 def main():
-    # Check if a file was provided as an argument
-    if len(sys.argv) > 1:
-        questions_file = sys.argv[1]
-    else:
-        questions_file = 'generated_questions.json'
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Display generated math MCQ questions one at a time.')
+    parser.add_argument('file', nargs='?', default='generated_questions.json', help='Questions file, .json or .jsonl (default: generated_questions.json)')
+    parser.add_argument('--start', type=int, default=1, help='Question number to start from (default: 1)')
+    parser.add_argument('--bank', type=str, default=None, help='Show questions from this question bank (see question_bank.py) instead of a file')
+    add_query_arguments(parser)
+    args = parser.parse_args()
+    questions_file = args.bank or args.file
     
     # Check if the file exists
     if not os.path.exists(questions_file):
         print(f"Error: File '{questions_file}' not found.")
-        print("Please run 'python mcq_generator.py' first to generate questions.")
+        if args.bank:
+            print("Please import questions with 'python question_bank.py --bank FILE import QUESTIONS_FILE' first.")
+        else:
+            print("Please run 'python mcq_generator.py' first to generate questions.")
         return
     
-    # Load the questions
+    # Open the questions lazily; only the questions actually shown are parsed
     try:
-        with open(questions_file, 'r') as f:
-            questions = json.load(f)
-    except json.JSONDecodeError:
-        print(f"Error: File '{questions_file}' is not a valid JSON file.")
+        if args.bank:
+            questions = QuestionBank(args.bank).query(offset=args.start - 1, **query_filters(args))
+        else:
+            if any(value is not None for value in query_filters(args).values()):
+                parser.error("query filters require --bank")
+            loader = QuestionLoader(questions_file)
+            questions = loader.iter_from(args.start - 1)
+        question = next(questions, None)
+    except (json.JSONDecodeError, ValueError):
+        print(f"Error: File '{questions_file}' is not a valid JSON or JSON Lines file.")
         return
     except Exception as e:
         print(f"Error loading questions: {e}")
         return
     
-    if not questions:
-        print("No questions found in the file.")
+    if question is None:
+        print("No matching questions found in the bank." if args.bank else "No questions found in the file.")
         return
     
     # Display each question
-    for i, question in enumerate(questions):
-        display_question(question, i+1)
+    question_number = max(1, args.start)
+    while question is not None:
+        display_question(question, question_number)
+        try:
+            question = next(questions, None)
+        except ValueError:
+            print(f"\nError: File '{questions_file}' contains invalid JSON after question {question_number}.")
+            return
+        question_number += 1
         
         # If not the last question, ask to continue
-        if i < len(questions) - 1:
+        if question is not None:
             print("\nPress Enter to continue to the next question...")
             input()
     
     print("\nAll questions completed!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,333 @@
+import csv
+import html
+import io
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+from xml.sax.saxutils import escape as xml_escape
+
+from question import Question
+
+# Questions rendered per task; each worker renders whole chunks to a string
+DEFAULT_CHUNK_SIZE = 2000
+
+# KaTeX release loaded by exported HTML pages
+KATEX_URL = "https://cdn.jsdelivr.net/npm/katex@0.16.9/dist"
+
+# Columns of the CSV export; options are spread over OPTION_COLUMNS columns
+OPTION_COLUMNS = 5
+CSV_COLUMNS = (
+    ["order", "title", "question", "instruction"]
+    + [f"option_{chr(97 + i)}" for i in range(OPTION_COLUMNS)]
+    + ["correct_option", "correct_letter", "explanation", "subject", "unit", "topic",
+       "difficulty", "plusmarks", "image_prompt", "image_alt"]
+)
+
+def _text(question: Question, key: str) -> str:
+    value = question.get(key)
+    return "" if value is None else str(value)
+
+# Markdown
+
+def markdown_header() -> str:
+    return "# Questions\n"
+
+def render_markdown(question: Question, number: int) -> str:
+    lines = [f"\n## Question {number}: {_text(question, 'title')}\n",
+             f"*{_text(question, 'subject')} → {_text(question, 'unit')} → {_text(question, 'topic')}"
+             f" · {_text(question, 'difficulty')}*\n",
+             _text(question, "question") + "\n"]
+    if question.get("instruction"):
+        lines.append(f"_{_text(question, 'instruction')}_\n")
+    for index, option in enumerate(question.options or ()):
+        lines.append(f"- **({chr(65 + index)})** {option}")
+    if question.get("image_prompt"):
+        lines.append(f"\n> Image: {_text(question, 'image_alt') or _text(question, 'image_prompt')}")
+    lines.append(f"\n**Answer:** ({question.correct_letter or '?'}) {question.correct_option}\n")
+    lines.append(f"**Explanation:** {_text(question, 'explanation')}\n")
+    return "\n".join(lines) + "\n"
+
+def markdown_footer() -> str:
+    return ""
+
+# HTML with KaTeX auto-rendering of the preserved LaTeX
+
+def html_header() -> str:
+    return f"""<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Questions</title>
+<link rel="stylesheet" href="{KATEX_URL}/katex.min.css">
+<script defer src="{KATEX_URL}/katex.min.js"></script>
+<script defer src="{KATEX_URL}/contrib/auto-render.min.js"
+  onload="renderMathInElement(document.body, {{delimiters: [
+    {{left: '$$', right: '$$', display: true}}, {{left: '\\\\[', right: '\\\\]', display: true}},
+    {{left: '$', right: '$', display: false}}, {{left: '\\\\(', right: '\\\\)', display: false}}]}});"></script>
+<style>
+body {{ font-family: sans-serif; max-width: 50em; margin: auto; }}
+section {{ border-bottom: 1px solid #ccc; padding: 1em 0; }}
+.meta {{ color: #666; font-size: 0.9em; }}
+.correct {{ font-weight: bold; }}
+</style>
+</head>
+<body>
+<h1>Questions</h1>
+"""
+
+# Attribute marking the correct option in HTML output
+CORRECT_CLASS = ' class="correct"'
+
+def render_html(question: Question, number: int) -> str:
+    def escape(key: str) -> str:
+        return html.escape(_text(question, key))
+    
+    options = "".join(
+        f'<li{CORRECT_CLASS if index == question.correct_index else ""}>{html.escape(str(option))}</li>'
+        for index, option in enumerate(question.options or ())
+    )
+    image = ""
+    if question.get("image_prompt"):
+        image = f'<p class="image"><em>Image: {escape("image_alt") or escape("image_prompt")}</em></p>\n'
+    return (
+        f'<section id="q{number}">\n'
+        f'<h2>Question {number}: {escape("title")}</h2>\n'
+        f'<p class="meta">{escape("subject")} → {escape("unit")} → {escape("topic")} · {escape("difficulty")}</p>\n'
+        f'<p>{escape("question")}</p>\n'
+        f'<p><em>{escape("instruction")}</em></p>\n'
+        f'{image}<ol type="A">{options}</ol>\n'
+        f'<details><summary>Answer</summary>\n'
+        f'<p>({question.correct_letter or "?"}) {html.escape(str(question.correct_option))}</p>\n'
+        f'<p>{escape("explanation")}</p>\n'
+        f'</details>\n'
+        f'</section>\n'
+    )
+
+def html_footer() -> str:
+    return "</body>\n</html>\n"
+
+# Moodle GIFT
+
+def _gift_escape(text: str) -> str:
+    for char in "\\~=#{}:":
+        text = text.replace(char, "\\" + char)
+    return text.replace("\n", "\\n")
+
+def gift_header() -> str:
+    return ""
+
+def render_gift(question: Question, number: int) -> str:
+    answers = []
+    for index, option in enumerate(question.options or ()):
+        answers.append(("=" if index == question.correct_index else "~") + _gift_escape(str(option)))
+    name = _gift_escape(f"{number}. {_text(question, 'title')}")
+    return (
+        f"// {_text(question, 'subject')} -> {_text(question, 'unit')} -> {_text(question, 'topic')}"
+        f" ({_text(question, 'difficulty')})\n"
+        f"::{name}::{_gift_escape(_text(question, 'question'))} {{\n"
+        + "".join(f"\t{answer}\n" for answer in answers)
+        + f"\t####{_gift_escape(_text(question, 'explanation'))}\n}}\n\n"
+    )
+
+def gift_footer() -> str:
+    return ""
+
+# Moodle XML
+
+def moodle_header() -> str:
+    return '<?xml version="1.0" encoding="UTF-8"?>\n<quiz>\n'
+
+def _moodle_html(text: str) -> str:
+    # Plain text becomes HTML, which is then embedded in XML
+    return xml_escape(html.escape(text))
+
+def render_moodle(question: Question, number: int) -> str:
+    def escape(key: str) -> str:
+        return xml_escape(_text(question, key))
+    
+    answers = "".join(
+        f'    <answer fraction="{100 if index == question.correct_index else 0}" format="html">'
+        f'<text>{_moodle_html(str(option))}</text></answer>\n'
+        for index, option in enumerate(question.options or ())
+    )
+    tags = "".join(f"<tag><text>{escape(key)}</text></tag>" for key in ("subject", "unit", "topic", "difficulty"))
+    return (
+        f'  <question type="multichoice">\n'
+        f'    <name><text>{xml_escape(str(number))}. {escape("title")}</text></name>\n'
+        f'    <questiontext format="html"><text>{_moodle_html(_text(question, "question"))}</text></questiontext>\n'
+        f'    <generalfeedback format="html"><text>{_moodle_html(_text(question, "explanation"))}</text></generalfeedback>\n'
+        f'    <defaultgrade>{escape("plusmarks") or 1}</defaultgrade>\n'
+        f'    <single>true</single>\n'
+        f'    <shuffleanswers>true</shuffleanswers>\n'
+        f'    <answernumbering>ABCD</answernumbering>\n'
+        f'{answers}'
+        f'    <tags>{tags}</tags>\n'
+        f'  </question>\n'
+    )
+
+def moodle_footer() -> str:
+    return "</quiz>\n"
+
+# CSV
+
+def csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(CSV_COLUMNS)
+    return buffer.getvalue()
+
+def render_csv(question: Question, number: int) -> str:
+    options = [str(option) for option in (question.options or ())][:OPTION_COLUMNS]
+    options += [""] * (OPTION_COLUMNS - len(options))
+    row = ([_text(question, "order") or number, _text(question, "title"), _text(question, "question"),
+            _text(question, "instruction")] + options
+           + [_text(question, "correct_option"), question.correct_letter or ""]
+           + [_text(question, key) for key in ("explanation", "subject", "unit", "topic", "difficulty",
+                                               "plusmarks", "image_prompt", "image_alt")])
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(row)
+    return buffer.getvalue()
+
+def csv_footer() -> str:
+    return ""
+
+# Export formats: name -> (file extension, header, render one question, footer)
+FORMATS: Dict[str, Tuple[str, Callable[[], str], Callable[[Question, int], str], Callable[[], str]]] = {
+    "markdown": (".md", markdown_header, render_markdown, markdown_footer),
+    "html": (".html", html_header, render_html, html_footer),
+    "gift": (".gift", gift_header, render_gift, gift_footer),
+    "moodle": (".xml", moodle_header, render_moodle, moodle_footer),
+    "csv": (".csv", csv_header, render_csv, csv_footer),
+}
+
+def render_chunk(format_name: str, questions: List[Any], first_number: int) -> str:
+    """
+    Render consecutive questions in one format.
+
+    Args:
+        format_name: Key of FORMATS
+        questions: Question objects in the JSON schema, or their undecoded JSON text
+        first_number: Display number of the first question
+
+    Returns:
+        Rendered text of all the questions
+    """
+    render = FORMATS[format_name][2]
+    parts = []
+    for number, question in enumerate(questions, first_number):
+        if not isinstance(question, dict):
+            question = json.loads(question)
+        parts.append(render(Question.from_dict(question), number))
+    return "".join(parts)
+
+def _chunks(questions: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    iterator = iter(questions)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+def export_questions(questions: Iterable[Any], output_path: str, format_name: str,
+                     workers: int = 0, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Render questions to a file, streaming chunks of rendered text as they are ready.
+
+    Inputs larger than one chunk are rendered by a pool of worker processes.
+    At most two chunks per worker are in flight, so memory use stays bounded
+    regardless of the input size, and chunks are written in input order.
+    Passing undecoded JSON text (QuestionLoader.iter_raw, QuestionBank.query
+    with raw=True) leaves all parsing to the workers, so the reading process
+    only shuffles bytes.
+
+    Args:
+        questions: Question objects in the JSON schema or their JSON text (any iterable)
+        output_path: File to write
+        format_name: Key of FORMATS
+        workers: Number of worker processes (0 for one per CPU, 1 to render in this process)
+        chunk_size: Questions per rendering task
+
+    Returns:
+        Number of questions exported
+    """
+    _, header, _, footer = FORMATS[format_name]
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(questions, max(1, chunk_size))
+    count = 0
+    newline = "" if format_name == "csv" else None
+    with open(output_path, "w", encoding="utf-8", newline=newline) as f:
+        f.write(header())
+        first = next(chunks, None)
+        second = next(chunks, None) if first is not None else None
+        if second is None or workers == 1:
+            # Small input (or no pool requested): render in this process
+            for chunk in chain((c for c in (first, second) if c is not None), chunks):
+                f.write(render_chunk(format_name, chunk, count + 1))
+                count += len(chunk)
+        else:
+            pending = deque()
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for chunk in [first, second]:
+                    pending.append(executor.submit(render_chunk, format_name, chunk, count + 1))
+                    count += len(chunk)
+                for chunk in chunks:
+                    if len(pending) >= 2 * workers:
+                        f.write(pending.popleft().result())
+                    pending.append(executor.submit(render_chunk, format_name, chunk, count + 1))
+                    count += len(chunk)
+                while pending:
+                    f.write(pending.popleft().result())
+        f.write(footer())
+    return count
+
+def main():
+    import argparse
+    from question_bank import QuestionBank, add_query_arguments, query_filters
+    from question_loader import QuestionLoader
+
+    parser = argparse.ArgumentParser(description='Export questions to Markdown, HTML (KaTeX), Moodle GIFT/XML or CSV.')
+    parser.add_argument('file', nargs='?', default=None, help='Questions file, .json or .jsonl (omit when using --bank)')
+    parser.add_argument('-f', '--format', choices=sorted(FORMATS), default='markdown', help='Export format (default: markdown)')
+    parser.add_argument('-o', '--output', type=str, default=None, help='Output file (default: input name with the format extension)')
+    parser.add_argument('-w', '--workers', type=int, default=0, help='Worker processes for large inputs (default: one per CPU, 1 disables the pool)')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help=f'Questions per rendering task (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument('--bank', type=str, default=None, help='Export questions from this question bank (see question_bank.py) instead of a file')
+    add_query_arguments(parser)
+    args = parser.parse_args()
+
+    if (args.file is None) == (args.bank is None):
+        parser.error("give either a questions file or --bank")
+    source = args.bank or args.file
+    if not os.path.exists(source):
+        print(f"Error: File '{source}' not found.")
+        sys.exit(2)
+    output = args.output or os.path.splitext(os.path.basename(source))[0] + FORMATS[args.format][0]
+
+    bank = None
+    if args.bank:
+        bank = QuestionBank(args.bank)
+        questions = bank.query(raw=True, **query_filters(args))
+    else:
+        if any(value is not None for value in query_filters(args).values()):
+            parser.error("query filters require --bank")
+        questions = QuestionLoader(args.file).iter_raw()
+
+    start_time = time.perf_counter()
+    try:
+        count = export_questions(questions, output, args.format, workers=args.workers, chunk_size=args.chunk_size)
+    except ValueError as e:
+        print(f"Error: '{source}' is not a valid JSON or JSON Lines file: {e}")
+        sys.exit(2)
+    finally:
+        if bank is not None:
+            bank.close()
+    elapsed = time.perf_counter() - start_time
+    rate = count / elapsed if elapsed > 0 else 0
+    print(f"Exported {count} questions to {output} in {elapsed:.2f}s ({rate:.0f} questions/s).")
+
+if __name__ == "__main__":
+    main()
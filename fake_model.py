@@ -0,0 +1,160 @@
+import json
+import math
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Template for the questions returned by the fake model
+FAKE_QUESTION = {
+    "title": "Fake Assessment",
+    "description": "Question produced by the local fake model",
+    "question": "What is 6 × 7?",
+    "instruction": "Choose the correct product.",
+    "difficulty": "easy",
+    "order": 1,
+    "options": ["36", "42", "48", "54"],
+    "correct_option": "42",
+    "explanation": "6 × 7 = 42.",
+    "subject": "Quantitative Math",
+    "unit": "Numbers and Operations",
+    "topic": "Computation with Whole Numbers",
+    "plusmarks": 1,
+    "image_prompt": "",
+    "image_alt": ""
+}
+
+# Curriculum code of FAKE_QUESTION's subject, unit and topic (position in ALLOWED_CURRICULUM)
+FAKE_CURRICULUM_CODE = 30
+
+# Topic and difficulty requirements in a topic-specific prompt
+TARGET_CURRICULUM = re.compile(r'"curriculum" MUST be (\d+) ')
+TARGET_DIFFICULTY = re.compile(r'difficulty "(easy|moderate|hard)"')
+
+# Prompt text asking for a curriculum code instead of subject, unit and topic
+CURRICULUM_CODE_FIELD = '"curriculum": int'
+
+# Characters per chunk of a streamed fake response
+STREAM_CHUNK_SIZE = 64
+
+# Retryable error raised by the fake model to simulate transient API failures
+class ServiceUnavailable(Exception):
+    code = 503
+
+class FakeResponse:
+    """Minimal stand-in for a Gemini response object."""
+
+    def __init__(self, text: str):
+        self.text = text
+
+def make_fake_question(rng: random.Random, response_size: int = 0) -> Dict[str, Any]:
+    """
+    Build a valid multiplication question from FAKE_QUESTION with random numbers.
+
+    Args:
+        rng: Random number generator
+        response_size: Approximate size in characters to pad the explanation to
+
+    Returns:
+        Question object
+    """
+    a, b = rng.randint(2, 99), rng.randint(2, 99)
+    answer = a * b
+    options = {answer}
+    while len(options) < 4:
+        options.add(answer + rng.randint(-20, 20))
+    question = dict(FAKE_QUESTION)
+    question["question"] = f"What is {a} × {b}?"
+    question["options"] = [str(option) for option in sorted(options)]
+    question["correct_option"] = str(answer)
+    question["explanation"] = f"{a} × {b} = {answer}."
+    if rng.random() < 0.5:
+        question["image_prompt"] = f"An array of {a} rows and {b} columns of dots."
+        question["image_alt"] = f"{a} by {b} dot array"
+    padding = response_size - len(json.dumps(question))
+    if padding > 0:
+        question["explanation"] += " " + "x" * padding
+    return question
+
+def encode_fake_curriculum(question: Dict[str, Any], code: int) -> Dict[str, Any]:
+    """Replace subject, unit and topic with a curriculum code, as the prompt's schema asks."""
+    encoded = {}
+    for key, value in question.items():
+        if key == "subject":
+            encoded["curriculum"] = code
+        elif key not in ("unit", "topic"):
+            encoded[key] = value
+    return encoded
+
+class FakeGenerativeModel:
+    """
+    Local stand-in for genai.GenerativeModel that never touches the network.
+
+    Responses are deterministic for a given seed. Question prompts get one
+    random multiplication question (or a JSON array of them when the prompt asks
+    for several), labelled with the topic and difficulty the prompt requires, if
+    any, and with a curriculum code when the prompt's schema asks for one; image
+    prompt requests get a plain-text description.
+
+    Args:
+        latency: Median seconds to wait for every generate_content call
+        response_text: Fixed text to return instead of generated questions
+        latency_sigma: Spread of the log-normal latency distribution (0 for a fixed latency)
+        error_rate: Fraction of calls that raise a retryable ServiceUnavailable error
+        response_size: Approximate size in characters of each generated question
+        seed: Seed for the random number generator
+    """
+
+    def __init__(self, latency: float = 0.0, response_text: Optional[str] = None,
+                 latency_sigma: float = 0.0, error_rate: float = 0.0, response_size: int = 0,
+                 seed: int = 0):
+        self.model_name = "fake-model"
+        self.latency = latency
+        self.response_text = response_text
+        self.latency_sigma = latency_sigma
+        self.error_rate = error_rate
+        self.response_size = response_size
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str, **kwargs: Any) -> FakeResponse:
+        with self._lock:
+            self.calls += 1
+            latency = self.latency
+            if latency and self.latency_sigma:
+                latency = self._rng.lognormvariate(math.log(latency), self.latency_sigma)
+            fail = self._rng.random() < self.error_rate
+            match = re.search(r"JSON array of exactly (\d+) objects", prompt)
+            count = int(match.group(1)) if match else 1
+            questions = [make_fake_question(self._rng, self.response_size) for _ in range(count)]
+        curriculum = TARGET_CURRICULUM.search(prompt)
+        difficulty = TARGET_DIFFICULTY.search(prompt)
+        if CURRICULUM_CODE_FIELD in prompt:
+            code = int(curriculum.group(1)) if curriculum else FAKE_CURRICULUM_CODE
+            questions = [encode_fake_curriculum(question, code) for question in questions]
+        for question in questions:
+            if difficulty:
+                question["difficulty"] = difficulty.group(1)
+
+        timeout = (kwargs.get('request_options') or {}).get('timeout')
+        if timeout is not None and latency > timeout:
+            time.sleep(timeout)
+            raise TimeoutError(f"Fake request exceeded timeout of {timeout}s")
+        if latency:
+            time.sleep(latency)
+        if fail:
+            raise ServiceUnavailable("Fake transient failure")
+
+        if self.response_text is not None:
+            text = self.response_text
+        elif "generating an image" in prompt:
+            text = "A clean diagram on a white background with labelled parts."
+        elif match:
+            text = json.dumps(questions)
+        else:
+            text = json.dumps(questions[0])
+        if kwargs.get('stream'):
+            return iter([FakeResponse(text[i:i + STREAM_CHUNK_SIZE]) for i in range(0, len(text), STREAM_CHUNK_SIZE)])
+        return FakeResponse(text)
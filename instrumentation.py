@@ -0,0 +1,217 @@
+import cProfile
+import json
+import math
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+# Histogram buckets grow by this factor, giving percentiles within ~10%
+_BUCKET_GROWTH = 1.2
+_LOG_GROWTH = math.log(_BUCKET_GROWTH)
+
+# Trace events buffered in memory before they are appended to the trace file
+TRACE_FLUSH_EVENTS = 1000
+
+class Histogram:
+    """Log-bucketed histogram of durations in seconds (constant memory)."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._buckets: Dict[int, int] = {}
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+        # Bucket by microseconds; everything under 1us shares bucket 0
+        bucket = int(math.log(value * 1e6) / _LOG_GROWTH) if value > 1e-6 else 0
+        self._buckets[bucket] = self._buckets.get(bucket, 0) + 1
+
+    def percentile(self, p: float) -> float:
+        """Return the approximate p-th percentile in seconds."""
+        if not self.count:
+            return 0.0
+        target = p / 100 * self.count
+        seen = 0
+        for bucket in sorted(self._buckets):
+            seen += self._buckets[bucket]
+            if seen >= target:
+                return min(self.max, _BUCKET_GROWTH ** (bucket + 1) / 1e6)
+        return self.max
+
+class _NullStage:
+    """Context manager used for stages while instrumentation is disabled."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class Metrics:
+    """
+    Per-stage timing histograms and counters for the generation pipeline.
+
+    While disabled, stage() returns a shared no-op context manager and count()
+    returns immediately, so instrumented code pays only an attribute check.
+    When tracing is on, every stage is also recorded as a Chrome trace event
+    (viewable in chrome://tracing or Perfetto). Events are appended to the
+    trace file every TRACE_FLUSH_EVENTS events, so memory use does not grow
+    with the length of the run.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.tracing = False
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+        self._events: List[Dict[str, Any]] = []
+        self._trace_file = None
+        self._trace_separator = ""
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def enable(self, trace_path: Optional[str] = None) -> None:
+        """Start collecting metrics, and stream trace events to trace_path if given."""
+        self.enabled = True
+        if trace_path is not None:
+            self._trace_file = open(trace_path, "w")
+            self._trace_file.write('{"displayTimeUnit": "ms", "traceEvents": [\n')
+            self._trace_separator = ""
+            self.tracing = True
+        self._origin = time.perf_counter()
+
+    def _flush_events(self) -> None:
+        # Called with the lock held
+        for event in self._events:
+            self._trace_file.write(self._trace_separator + json.dumps(event))
+            self._trace_separator = ",\n"
+        self._events.clear()
+
+    def stage(self, name: str):
+        """Return a context manager timing one occurrence of a pipeline stage."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return self._timed(name)
+
+    @contextmanager
+    def _timed(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                histogram = self.histograms.get(name)
+                if histogram is None:
+                    histogram = self.histograms[name] = Histogram()
+                histogram.add(end - start)
+                if self.tracing:
+                    self._events.append({
+                        "name": name, "ph": "X", "pid": os.getpid(), "tid": threading.get_ident(),
+                        "ts": (start - self._origin) * 1e6, "dur": (end - start) * 1e6,
+                    })
+                    if len(self._events) >= TRACE_FLUSH_EVENTS:
+                        self._flush_events()
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Add value to a counter."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def record_usage(self, usage: Optional[Any]) -> None:
+        """Add the token counts from a Gemini response's usage_metadata."""
+        if not self.enabled or usage is None:
+            return
+        for field in ("prompt_token_count", "candidates_token_count", "total_token_count"):
+            value = getattr(usage, field, None)
+            if isinstance(value, int):
+                self.count(field.replace("_count", "s"), value)
+
+    def report(self) -> str:
+        """Return a human-readable summary of all stages and counters."""
+        lines = [f"{'stage':<14}{'count':>8}{'total s':>10}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"]
+        for name, h in sorted(self.histograms.items()):
+            lines.append(
+                f"{name:<14}{h.count:>8}{h.total:>10.3f}{h.total / h.count * 1000:>10.2f}"
+                f"{h.percentile(50) * 1000:>10.2f}{h.percentile(95) * 1000:>10.2f}"
+                f"{h.percentile(99) * 1000:>10.2f}{h.max * 1000:>10.2f}"
+            )
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name}: {value}")
+        return "\n".join(lines)
+
+    def close_trace(self) -> None:
+        """Write the remaining trace events and complete the Chrome trace file."""
+        with self._lock:
+            if self._trace_file is None:
+                return
+            self._flush_events()
+            self._trace_file.write("\n]}\n")
+            self._trace_file.close()
+            self._trace_file = None
+            self.tracing = False
+
+class ThreadProfiler:
+    """
+    cProfile profiler covering the main thread and every thread started after start().
+
+    Each thread gets its own cProfile.Profile (installed through
+    threading.setprofile), and the profiles are merged when the stats are
+    dumped, so work done in worker pools shows up alongside the main thread.
+    On Python versions where one profiler already sees every thread, only the
+    first profile is used.
+    """
+
+    def __init__(self):
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Profile the calling thread and every thread started from now on."""
+        threading.setprofile(self._start_thread)
+        self._enable_profile()
+
+    def _start_thread(self, frame, event, arg) -> None:
+        # Runs once in each new thread, then hands over to a cProfile profiler
+        sys.setprofile(None)
+        self._enable_profile()
+
+    def _enable_profile(self) -> None:
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profile is already active for the whole process
+            return
+        with self._lock:
+            self._profiles.append(profile)
+
+    def stop(self) -> None:
+        """Stop profiling; threads started afterwards are not profiled."""
+        threading.setprofile(None)
+        with self._lock:
+            profiles = list(self._profiles)
+        for profile in profiles:
+            profile.disable()
+
+    def dump_stats(self, path: str) -> None:
+        """Write the merged stats of all profiled threads in pstats format."""
+        with self._lock:
+            profiles = list(self._profiles)
+        if profiles:
+            pstats.Stats(*profiles).dump_stats(path)
+
+# Metrics shared by the whole process; disabled unless a command-line flag enables it
+METRICS = Metrics()
@@ -1,53 +1,69 @@
 import json
 import os
-import google.generativeai as genai
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Deque, Iterator, Optional, Set, Tuple
+from curriculum import CURRICULUM_SEPARATOR
+from curriculum_scheduler import CurriculumScheduler, load_plan
+from prompt_templates import IMAGE_PROMPT, decode_curriculum, prompt_report, question_prompt_builder, scope_codes
+from question_validator import validate_question
+from answer_checker import MISMATCH, check_answer
+from response_parser import JsonStreamExtractor, extract_json_values
+from instrumentation import METRICS, ThreadProfiler
+from response_cache import DEFAULT_CACHE_DIR, ResponseCache
+from dedup_index import DuplicateIndex
+from resilience import CircuitBreaker, ResilientCaller, is_fatal
+from question_writer import JsonArrayWriter, JsonlWriter, finalize_jsonl, read_completed_orders
 
-# Configure the Gemini API
+# Gemini API key (the API is configured lazily on the first real model call)
 API_KEY = "ADD YOUR GEMINI API KEY HERE"
-genai.configure(api_key=API_KEY)
 
-# Define the allowed curriculum options
-ALLOWED_CURRICULUM = [
-    "Quantitative Math -> Problem Solving -> Numbers and Operations",
-    "Quantitative Math -> Problem Solving -> Algebra",
-    "Quantitative Math -> Problem Solving -> Geometry",
-    "Quantitative Math -> Problem Solving -> Probability and Statistics",
-    "Quantitative Math -> Problem Solving -> Data Analysis",
-    "Quantitative Math -> Algebra -> Algebraic Word Problems",
-    "Quantitative Math -> Algebra -> Interpreting Variables",
-    "Quantitative Math -> Algebra -> Polynomial Expressions (FOIL/Factoring)",
-    "Quantitative Math -> Algebra -> Rational Expressions",
-    "Quantitative Math -> Algebra -> Exponential Expressions (Product rule, negative exponents)",
-    "Quantitative Math -> Algebra -> Quadratic Equations & Functions (Finding roots/solutions, graphing)",
-    "Quantitative Math -> Algebra -> Functions Operations",
-    "Quantitative Math -> Geometry and Measurement -> Area & Volume",
-    "Quantitative Math -> Geometry and Measurement -> Perimeter",
-    "Quantitative Math -> Geometry and Measurement -> Lines, Angles, & Triangles",
-    "Quantitative Math -> Geometry and Measurement -> Right Triangles & Trigonometry",
-    "Quantitative Math -> Geometry and Measurement -> Circles (Area, circumference)",
-    "Quantitative Math -> Geometry and Measurement -> Coordinate Geometry",
-    "Quantitative Math -> Geometry and Measurement -> Slope",
-    "Quantitative Math -> Geometry and Measurement -> Transformations (Dilating a shape)",
-    "Quantitative Math -> Geometry and Measurement -> Parallel & Perpendicular Lines",
-    "Quantitative Math -> Geometry and Measurement -> Solid Figures (Volume of Cubes)",
-    "Quantitative Math -> Numbers and Operations -> Basic Number Theory",
-    "Quantitative Math -> Numbers and Operations -> Prime & Composite Numbers",
-    "Quantitative Math -> Numbers and Operations -> Rational Numbers",
-    "Quantitative Math -> Numbers and Operations -> Order of Operations",
-    "Quantitative Math -> Numbers and Operations -> Estimation",
-    "Quantitative Math -> Numbers and Operations -> Fractions, Decimals, & Percents",
-    "Quantitative Math -> Numbers and Operations -> Sequences & Series",
-    "Quantitative Math -> Numbers and Operations -> Computation with Whole Numbers",
-    "Quantitative Math -> Numbers and Operations -> Operations with Negatives",
-    "Quantitative Math -> Data Analysis & Probability -> Interpretation of Tables & Graphs",
-    "Quantitative Math -> Data Analysis & Probability -> Trends & Inferences",
-    "Quantitative Math -> Data Analysis & Probability -> Probability (Basic, Compound Events)",
-    "Quantitative Math -> Data Analysis & Probability -> Mean, Median, Mode, & Range",
-    "Quantitative Math -> Data Analysis & Probability -> Weighted Averages",
-    "Quantitative Math -> Data Analysis & Probability -> Counting & Arrangement Problems",
-    "Quantitative Math -> Reasoning -> Word Problems"
-]
+# Model names to try, in order of preference
+MODEL_NAMES = ('gemini-1.5-pro', 'gemini-pro')
+
+# Provider of the Gemini model shared by all calls in this process
+class ModelProvider:
+    """
+    Create the Gemini model once per process and reuse it for every call.
+    
+    google.generativeai is only imported (and configured) when the model is
+    first requested, so sample runs and library imports never pay for it.
+    
+    Args:
+        model_names: Model names to try, in order of preference
+        api_key: Gemini API key
+    """
+    
+    def __init__(self, model_names=MODEL_NAMES, api_key: str = API_KEY):
+        self.model_names = tuple(model_names)
+        self.api_key = api_key
+        self._model = None
+        self._lock = threading.Lock()
+    
+    def get(self):
+        """Return the shared model, creating it on first use."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._create()
+        return self._model
+    
+    def _create(self):
+        import google.generativeai as genai
+        genai.configure(api_key=self.api_key)
+        
+        for i, name in enumerate(self.model_names):
+            try:
+                return genai.GenerativeModel(name)
+            except Exception as e:
+                if i == len(self.model_names) - 1:
+                    raise
+                print(f"Error initializing {name} model: {e}")
+                print(f"Falling back to {self.model_names[i + 1]} model...")
+
+DEFAULT_MODEL_PROVIDER = ModelProvider()
 
 # Base questions for reference
 BASE_QUESTION_1 = """
@@ -85,119 +101,537 @@ the dimensions, in centimeters, of the rectangular package?
 (E) $6 \times 8 \times 12$
 """
 
+# Function to build the question generation prompt
+def build_question_prompt(base_questions: List[str], num_questions: int = 1,
+                          curriculum: Optional[str] = None, difficulty: Optional[str] = None,
+                          curriculum_scope: Optional[str] = None) -> str:
+    """
+    Build the prompt asking Gemini for new questions similar to the base questions.
+    
+    The template is compiled once per set of base questions and scope (see
+    prompt_templates); the curriculum is listed as numbered codes that
+    questions_from_values maps back to subject, unit and topic.
+    
+    Args:
+        base_questions: List of base questions to use as reference
+        num_questions: Number of new questions to request
+        curriculum: Optional ALLOWED_CURRICULUM entry the questions must cover
+        difficulty: Optional difficulty the questions must have
+        curriculum_scope: Optional subject, unit or topic limiting the curriculum offered to the model
+        
+    Returns:
+        Prompt text
+    """
+    builder = question_prompt_builder(tuple(base_questions), curriculum_scope)
+    return builder.render(num_questions, curriculum=curriculum, difficulty=difficulty)
+
 # Function to generate a new question using Gemini
-def generate_question(base_questions: List[str], num_questions: int = 1) -> List[Dict[str, Any]]:
+def generate_question(base_questions: List[str], num_questions: int = 1, model=None,
+                      timeout: Optional[float] = None, cache: Optional[ResponseCache] = None,
+                      cache_params: Optional[Dict[str, Any]] = None,
+                      resilience: Optional[ResilientCaller] = None,
+                      stream: bool = False, curriculum: Optional[str] = None,
+                      difficulty: Optional[str] = None,
+                      curriculum_scope: Optional[str] = None) -> List[Dict[str, Any]]:
     """
     Generate new math questions similar to the base questions using Gemini.
     
     Args:
         base_questions: List of base questions to use as reference
         num_questions: Number of new questions to generate
+        model: Optional model object exposing generate_content (defaults to the shared Gemini model)
+        timeout: Optional per-request timeout in seconds
+        cache: Optional response cache to read from and write to
+        cache_params: Extra parameters distinguishing otherwise identical requests in the cache
+        resilience: Optional retry/circuit-breaker policy for the model call
+        stream: Whether to stream the response and parse it while it arrives
+        curriculum: Optional ALLOWED_CURRICULUM entry the questions must cover
+        difficulty: Optional difficulty the questions must have
+        curriculum_scope: Optional subject, unit or topic limiting the curriculum offered to the model
         
     Returns:
-        List of generated question objects
+        List of generated question objects (empty if the call failed after retries)
+        
+    Raises:
+        Exception: Fatal model errors (bad credentials, invalid requests, see is_fatal) are re-raised
     """
-    # Initialize Gemini model
-    try:
-        model = genai.GenerativeModel('gemini-1.5-pro')
-    except Exception as e:
-        print(f"Error initializing gemini-1.5-pro model: {e}")
-        print("Falling back to gemini-1.0-pro model...")
-        model = genai.GenerativeModel('gemini-pro')
+    # Reuse the shared Gemini model
+    if model is None:
+        model = DEFAULT_MODEL_PROVIDER.get()
     
     # Create prompt for Gemini
-    prompt = f"""
-    You are an expert math teacher creating multiple-choice questions (MCQs) for middle/high school students.
-    
-    I'll provide you with two base math questions. Your task is to create {num_questions} new, original math question(s) 
-    that are similar in style, difficulty, and topic to these base questions.
-    
-    BASE QUESTIONS:
-    {base_questions[0]}
-    
-    {base_questions[1]}
-    
-    REQUIREMENTS FOR THE OUTPUT:
-    - Output ONLY a single JSON object (no extra text) with the following keys:
-      {{
-        "title": string,                                         # A meaningful title for the assessment
-        "description": string,                                  # Brief description of the assessment
-        "question": string,                                     # The actual question text
-        "instruction": string,                                  # Instructions for the student
-        "difficulty": "easy"|"moderate"|"hard",                # Difficulty level
-        "order": 1|2,                                          # Question number
-        "options": [string, string, string, string, ...],      # 4-5 options preferred
-        "correct_option": string,                              # Must match exactly one option text
-        "explanation": string,                                  # Detailed explanation of the solution
-        "subject": string,                                      # Choose from allowed curriculum list
-        "unit": string,                                         # Choose from allowed curriculum list
-        "topic": string,                                        # Choose from allowed curriculum list
-        "plusmarks": 1,                                         # Points for the question
-        "image_prompt": string,                                # Text prompt to create the diagram/image
-        "image_alt": string                                    # Alt text for the image
-      }}
-    
-    - The allowed subject/unit/topic MUST be chosen from this list (pick the best fit):
-    {ALLOWED_CURRICULUM}
-    
-    - Make the question clear for a middle/high-school audience, include only necessary numbers.
-    - Ensure exactly one option is correct.
-    - If the question requires an image, provide a detailed image_prompt that describes what should be in the image.
-    - Preserve any LaTeX formatting for equations and formulas.
-    - Keep JSON compact and valid. Use double quotes.
-    """
+    with METRICS.stage("prompt"):
+        prompt = build_question_prompt(base_questions, num_questions, curriculum=curriculum, difficulty=difficulty,
+                                       curriculum_scope=curriculum_scope)
     
-    # Generate response from Gemini
+    # Generate response from Gemini, extracting JSON values as the text arrives
+    extractor = JsonStreamExtractor()
     try:
-        response = model.generate_content(prompt)
+        response_text = generate_text(model, prompt, timeout=timeout, cache=cache, cache_params=cache_params,
+                                      resilience=resilience, stream=stream, extractor=extractor)
     except Exception as e:
+        # Fatal errors (bad key, invalid request, ...) would fail for every question; anything
+        # else (e.g. a blocked or empty candidate) only loses this response, which is requested again
+        if is_fatal(e):
+            raise
         print(f"Error generating content: {e}")
-        print("Returning a default question template...")
-        # Return a default template if generation fails
-        return [{
-            "title": "Math Assessment",
-            "description": "Basic math assessment for middle school students",
-            "question": "If a rectangle has a length of 8 units and a width of 6 units, what is its area?",
-            "instruction": "Calculate the area of the rectangle.",
-            "difficulty": "easy",
-            "order": 1,
-            "options": ["14 square units", "24 square units", "48 square units", "54 square units"],
-            "correct_option": "48 square units",
-            "explanation": "The area of a rectangle is calculated by multiplying its length by its width. In this case, 8 × 6 = 48 square units.",
-            "subject": "Quantitative Math",
-            "unit": "Geometry and Measurement",
-            "topic": "Area & Volume",
-            "plusmarks": 1,
-            "image_prompt": "A rectangle with length 8 units and width 6 units, with grid lines showing the area.",
-            "image_alt": "Rectangle with dimensions 8×6 units"
-        }]
-    
-    # Extract and parse JSON from response
-    try:
-        # Find JSON in the response
-        response_text = response.text
-        json_start = response_text.find('{')
-        json_end = response_text.rfind('}')
+        return []
+    
+    with METRICS.stage("parse"):
+        questions = questions_from_values(extractor.finish())
+    if not questions:
+        print(f"Error: No valid questions found in the response: {response_text[:500]}")
+    return questions
+
+# Function to call the model, going through the response cache when one is given
+def generate_text(model, prompt: str, timeout: Optional[float] = None, cache: Optional[ResponseCache] = None,
+                  cache_params: Optional[Dict[str, Any]] = None,
+                  resilience: Optional[ResilientCaller] = None, stream: bool = False,
+                  extractor: Optional[JsonStreamExtractor] = None) -> str:
+    """
+    Send a prompt to the model and return the response text.
+    
+    Args:
+        model: Model object exposing generate_content
+        prompt: Prompt to send
+        timeout: Optional per-request timeout in seconds
+        cache: Optional response cache to read from and write to
+        cache_params: Extra parameters included in the cache key
+        resilience: Optional retry/circuit-breaker policy for the model call
+        stream: Whether to request a streamed response
+        extractor: Optional JSON extractor fed with the response text as it arrives
+            (reset before every attempt, so retries do not duplicate values)
+        
+    Returns:
+        Response text
+    """
+    key = None
+    if cache is not None:
+        params = dict(cache_params or {})
+        params['generation_config'] = getattr(model, '_generation_config', None)
+        key = cache.make_key(getattr(model, 'model_name', ''), prompt, params)
+        cached = cache.get(key)
+        METRICS.count("cache_hits" if cached is not None else "cache_misses")
+        if cached is not None:
+            if extractor is not None:
+                extractor.reset()
+                extractor.feed(cached)
+            return cached
+    
+    def call_model() -> str:
+        if extractor is not None:
+            extractor.reset()
+        options = {"request_options": {"timeout": timeout}} if timeout else {}
+        METRICS.count("model_calls")
+        with METRICS.stage("model_call"):
+            if not stream:
+                response = model.generate_content(prompt, **options)
+                text = response.text
+                if extractor is not None:
+                    extractor.feed(text)
+                METRICS.record_usage(getattr(response, "usage_metadata", None))
+                return text
+            parts = []
+            usage = None
+            for chunk in model.generate_content(prompt, stream=True, **options):
+                parts.append(chunk.text)
+                if extractor is not None:
+                    extractor.feed(chunk.text)
+                usage = getattr(chunk, "usage_metadata", None) or usage
+            METRICS.record_usage(usage)
+            return "".join(parts)
+    
+    text = resilience.call(call_model) if resilience is not None else call_model()
+    if key is not None:
+        cache.put(key, text)
+    return text
+
+# Function to parse one or more questions out of a model response
+def parse_questions_response(response_text: str) -> List[Dict[str, Any]]:
+    """
+    Parse a model response containing one or more JSON objects or arrays of objects.
+    
+    Args:
+        response_text: Raw text returned by the model
         
-        if json_start >= 0 and json_end >= 0:
-            json_str = response_text[json_start:json_end+1]
-            question_data = json.loads(json_str)
-            return [question_data]
+    Returns:
+        List of valid question objects (possibly empty)
+    """
+    return questions_from_values(extract_json_values(response_text))
+
+def questions_from_values(values: List[Any]) -> List[Dict[str, Any]]:
+    """
+    Collect question objects from JSON values extracted from a model response.
+    
+    Arrays are flattened, as is a wrapper object holding a single list of
+    questions (e.g. {"questions": [...]}). Items are validated one by one;
+    invalid items are dropped so that a batch with a single bad question still
+    yields the rest. A numeric "curriculum" code is replaced by the subject,
+    unit and topic it stands for before validation.
+    
+    Args:
+        values: Extracted JSON values
+        
+    Returns:
+        List of valid question objects (possibly empty)
+    """
+    items = []
+    for value in values:
+        if isinstance(value, list):
+            items.extend(value)
+        elif isinstance(value, dict) and len(value) == 1 and isinstance(next(iter(value.values())), list):
+            items.extend(next(iter(value.values())))
         else:
-            print("Error: Could not find JSON in the response")
-            return []
-    except Exception as e:
-        print(f"Error parsing response: {e}")
-        print(f"Response text: {response.text}")
-        return []
+            items.append(value)
+    
+    questions = []
+    for i, item in enumerate(items):
+        if isinstance(item, dict):
+            item = decode_curriculum(item)
+        errors = validate_question(item)
+        if errors:
+            print(f"Skipping item {i+1}: {'; '.join(errors)}")
+            continue
+        questions.append(item)
+    return questions
+
+# Token-bucket rate limiter shared by all generation workers
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter.
+    
+    Args:
+        rate: Tokens added per second (i.e. the sustained request rate)
+        capacity: Maximum burst size (defaults to max(1, rate))
+    """
+    
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self) -> None:
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+# Function to generate many questions concurrently
+def iter_questions_concurrently(base_questions: List[str], num_questions: int, workers: int = 4,
+                                timeout: Optional[float] = None, rate: Optional[float] = None,
+                                model=None, verbose: bool = False, batch_size: int = 1,
+                                max_attempts: int = 3, cache: Optional[ResponseCache] = None,
+                                skip_orders: Optional[Set[int]] = None,
+                                dedup_index: Optional[DuplicateIndex] = None,
+                                regenerate_duplicates: bool = False,
+                                resilience: Optional[ResilientCaller] = None,
+                                stream: bool = False, enrich_images: bool = False,
+                                enrich_workers: int = 4, answer_check: Optional[str] = None,
+                                curriculum_scope: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Generate questions using a bounded pool of worker threads, yielding them in order.
+    
+    The 'order' slots still to be filled are split into batches of up to
+    batch_size questions, each produced by a single model call. Batches run
+    concurrently, so wall-clock time scales with the number of workers rather
+    than the number of questions. If a batch comes back short, the missing
+    questions are requested again (up to max_attempts calls per batch). Each
+    question's 'order' is set to its slot and questions are yielded in slot
+    order as soon as all earlier batches are done, so output is deterministic
+    regardless of completion order and can be written incrementally. At most
+    2 * workers batches are submitted ahead of the one being yielded, so
+    memory stays bounded however many questions are requested.
+    
+    With enrich_images, every question that has an image_prompt is handed to a
+    separate pool of enrich_workers threads as soon as its batch completes, and
+    the prompt is rewritten with generate_image_prompt. Enrichment therefore
+    overlaps with generation of later batches instead of adding a second
+    serial model call per question.
+    
+    Args:
+        base_questions: List of base questions to use as reference
+        num_questions: Number of questions to generate
+        workers: Maximum number of concurrent model calls
+        timeout: Optional per-request timeout in seconds
+        rate: Optional maximum number of requests per second
+        model: Optional model object shared by all workers (defaults to the shared Gemini model)
+        verbose: Whether to print progress
+        batch_size: Number of questions to request per model call
+        max_attempts: Maximum number of model calls per batch
+        cache: Optional response cache shared by all workers
+        skip_orders: 'order' slots that are already complete (e.g. when resuming)
+        dedup_index: Optional near-duplicate index; duplicates of stored or reserved questions are
+            rejected, and accepted questions are reserved for the caller to add once written
+        regenerate_duplicates: Whether to request a replacement for each rejected duplicate
+        resilience: Optional retry/circuit-breaker policy shared by all workers
+        stream: Whether to stream responses and parse them while they arrive
+        enrich_images: Whether to rewrite image prompts with generate_image_prompt
+        enrich_workers: Maximum number of concurrent image prompt calls
+        answer_check: None, "flag" or "reject" (see passes_answer_check)
+        curriculum_scope: Optional subject, unit or topic limiting the curriculum offered to the model
+        
+    Yields:
+        Generated question objects ordered by 'order'
+    """
+    limiter = TokenBucket(rate) if rate else None
+    batch_size = max(1, batch_size)
+    skip_orders = skip_orders or set()
+    
+    def iter_batches() -> Iterator[List[int]]:
+        batch = []
+        for order in range(1, num_questions + 1):
+            if order in skip_orders:
+                continue
+            batch.append(order)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+    
+    def run_batch(batch: List[int]) -> List[Tuple[Dict[str, Any], Optional[Future]]]:
+        start, count = batch[0], len(batch)
+        questions = []
+        rejected = 0
+        for attempt in range(max_attempts):
+            missing = count - len(questions) - rejected
+            if missing <= 0:
+                break
+            if limiter:
+                limiter.acquire()
+            if verbose:
+                print(f"Generating questions {start}-{batch[-1]}/{num_questions} ({missing} requested)...")
+            # The batch position and attempt keep cached responses distinct across batches
+            cache_params = {"start": start, "count": missing, "attempt": attempt}
+            new_questions = generate_question(base_questions, num_questions=missing, model=model, timeout=timeout,
+                                              cache=cache, cache_params=cache_params,
+                                              resilience=resilience, stream=stream,
+                                              curriculum_scope=curriculum_scope)[:missing]
+            for q in new_questions:
+                # Rejected answers are not counted, so they are requested again
+                if not passes_answer_check(q, answer_check):
+                    continue
+                duplicate = dedup_index.reserve(q) if dedup_index is not None else None
+                if duplicate is None:
+                    questions.append(q)
+                else:
+                    if verbose:
+                        print(f"Rejected near-duplicate question (similarity {duplicate[1]:.2f}): {q['question'][:60]}")
+                    if not regenerate_duplicates:
+                        rejected += 1
+        for order, q in zip(batch, questions):
+            q['order'] = order
+        
+        # Queue image prompt enrichment without waiting for it
+        return submit_enrichment(enrich_executor, questions, limiter=limiter, model=model, cache=cache,
+                                 resilience=resilience, timeout=timeout)
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    enrich_executor = ThreadPoolExecutor(max_workers=max(1, enrich_workers)) if enrich_images else None
+    batches = iter_batches()
+    window: Deque[Future] = deque()
+    try:
+        # Keep a bounded window of batches in flight and yield from its head in order
+        for batch in batches:
+            window.append(executor.submit(run_batch, batch))
+            if len(window) >= 2 * max(1, workers):
+                break
+        while window:
+            results = window.popleft().result()
+            batch = next(batches, None)
+            if batch is not None:
+                window.append(executor.submit(run_batch, batch))
+            for q, enrichment in results:
+                if enrichment is not None:
+                    q['image_prompt'] = enrichment.result()
+                yield q
+    finally:
+        # Don't start queued work after a fatal error or if the caller stops early
+        executor.shutdown(wait=True, cancel_futures=True)
+        if enrich_executor is not None:
+            enrich_executor.shutdown(wait=True, cancel_futures=True)
+
+def generate_questions_concurrently(base_questions: List[str], num_questions: int, **kwargs) -> List[Dict[str, Any]]:
+    """
+    Generate questions concurrently and return them as a list ordered by 'order'.
+    
+    Accepts the same keyword arguments as iter_questions_concurrently.
+    """
+    return list(iter_questions_concurrently(base_questions, num_questions, **kwargs))
+
+# Function to run a coverage plan, requesting topic-specific questions until every quota is filled
+def iter_planned_questions(base_questions: List[str], scheduler: CurriculumScheduler, workers: int = 4,
+                           timeout: Optional[float] = None, rate: Optional[float] = None, model=None,
+                           verbose: bool = False, batch_size: int = 1, cache: Optional[ResponseCache] = None,
+                           dedup_index: Optional[DuplicateIndex] = None,
+                           resilience: Optional[ResilientCaller] = None, stream: bool = False,
+                           enrich_images: bool = False, enrich_workers: int = 4,
+                           answer_check: Optional[str] = None, first_order: int = 1) -> Iterator[Dict[str, Any]]:
+    """
+    Generate questions for a curriculum coverage plan using a bounded pool of worker threads.
+    
+    Up to `workers` requests are kept in flight. Whenever one finishes, the
+    scheduler picks the topic and difficulty with the most open slots for the
+    next request, so calls are only issued for buckets that still need
+    questions. Returned questions are credited to their actual bucket and
+    yielded in completion order; over-quota and off-plan questions are dropped.
+    
+    Args:
+        base_questions: List of base questions to use as style reference
+        scheduler: Scheduler holding the coverage plan and quotas
+        workers: Maximum number of requests in flight
+        timeout: Optional per-request timeout in seconds
+        rate: Optional maximum number of requests per second across all workers
+        model: Optional model object exposing generate_content (defaults to the shared Gemini model)
+        verbose: Whether to print progress for each request
+        batch_size: Maximum number of questions to request per API call
+        cache: Optional response cache shared by all workers
+        dedup_index: Optional near-duplicate index; duplicates of stored or reserved questions are
+            rejected, and accepted questions are reserved for the caller to add once written
+        resilience: Optional retry/circuit-breaker policy shared by all workers
+        stream: Whether to stream responses and parse them while they arrive
+        enrich_images: Whether to rewrite image prompts with generate_image_prompt
+        enrich_workers: Maximum number of concurrent image prompt calls
+        answer_check: None, "flag" or "reject" (see passes_answer_check)
+        first_order: 'order' assigned to the first yielded question
+        
+    Yields:
+        Generated question objects, numbered consecutively from first_order
+    """
+    limiter = TokenBucket(rate) if rate else None
+    
+    def run_request(bucket, count: int, call: int) -> List[Tuple[Dict[str, Any], Optional[Future]]]:
+        curriculum, difficulty = bucket
+        if limiter:
+            limiter.acquire()
+        if verbose:
+            print(f"Requesting {count} {difficulty} question(s) on {curriculum}...")
+        # The bucket and call number keep cached responses distinct across requests
+        cache_params = {"curriculum": curriculum, "difficulty": difficulty, "count": count, "call": call}
+        accepted = []
+        in_bucket = 0
+        try:
+            new_questions = generate_question(base_questions, num_questions=count, model=model, timeout=timeout,
+                                              cache=cache, cache_params=cache_params, resilience=resilience,
+                                              stream=stream, curriculum=curriculum, difficulty=difficulty)
+            for q in new_questions:
+                if not passes_answer_check(q, answer_check) or not scheduler.claim(q):
+                    continue
+                duplicate = dedup_index.reserve(q) if dedup_index is not None else None
+                if duplicate is not None:
+                    scheduler.unclaim(q)
+                    if verbose:
+                        print(f"Rejected near-duplicate question (similarity {duplicate[1]:.2f}): {q['question'][:60]}")
+                    continue
+                accepted.append(q)
+                if (q['subject'], q['unit'], q['topic']) == tuple(curriculum.split(CURRICULUM_SEPARATOR)) \
+                        and q['difficulty'] == difficulty:
+                    in_bucket += 1
+        finally:
+            scheduler.complete(bucket, count, in_bucket)
+        return submit_enrichment(enrich_executor, accepted, limiter=limiter, model=model, cache=cache,
+                                 resilience=resilience, timeout=timeout)
+    
+    executor = ThreadPoolExecutor(max_workers=max(1, workers))
+    enrich_executor = ThreadPoolExecutor(max_workers=max(1, enrich_workers)) if enrich_images else None
+    pending: Set[Future] = set()
+    order = first_order
+    try:
+        while True:
+            # Keep the pool busy with requests for buckets that still have open slots
+            while len(pending) < max(1, workers):
+                request = scheduler.next_request(batch_size)
+                if request is None:
+                    break
+                pending.add(executor.submit(run_request, *request))
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                for q, enrichment in future.result():
+                    if enrichment is not None:
+                        q['image_prompt'] = enrichment.result()
+                    q['order'] = order
+                    order += 1
+                    yield q
+    finally:
+        # Don't start queued work after a fatal error or if the caller stops early
+        executor.shutdown(wait=True, cancel_futures=True)
+        if enrich_executor is not None:
+            enrich_executor.shutdown(wait=True, cancel_futures=True)
+
+# Function to check a generated question's answer against its explanation
+def passes_answer_check(question: Dict[str, Any], mode: Optional[str]) -> bool:
+    """
+    Compare correct_option with the result computed in the explanation.
+    
+    Args:
+        question: Generated question
+        mode: None to skip the check, "flag" to report mismatches, "reject" to report and drop them
+        
+    Returns:
+        False if the question should be dropped
+    """
+    if mode is None:
+        return True
+    status, detail = check_answer(question)
+    if status != MISMATCH:
+        return True
+    METRICS.count("answer_mismatches")
+    action = "rejected" if mode == "reject" else "flagged"
+    print(f"Answer mismatch {action} ({detail}): {question['question'][:60]}")
+    return mode != "reject"
+
+# Function to queue image prompt enrichment for generated questions
+def submit_enrichment(executor: Optional[ThreadPoolExecutor], questions: List[Dict[str, Any]],
+                      limiter: Optional[TokenBucket] = None, **kwargs) -> List[Tuple[Dict[str, Any], Optional[Future]]]:
+    """
+    Submit generate_image_prompt calls for questions that have an image prompt.
+    
+    Args:
+        executor: Enrichment thread pool, or None to skip enrichment
+        questions: Generated questions
+        limiter: Optional rate limiter shared with question generation
+        **kwargs: Keyword arguments for generate_image_prompt (model, cache, resilience, timeout)
+        
+    Returns:
+        (question, future of its enriched image prompt or None) pairs
+    """
+    def enrich(question: Dict[str, Any]) -> str:
+        if limiter:
+            limiter.acquire()
+        # On failure keep the model's original image prompt
+        return generate_image_prompt(question, fallback=question['image_prompt'], **kwargs)
+    
+    if executor is None:
+        return [(q, None) for q in questions]
+    return [(q, executor.submit(enrich, q) if q.get('image_prompt') else None) for q in questions]
 
 # Function to generate image prompt for a question
-def generate_image_prompt(question_data: Dict[str, Any]) -> str:
+def generate_image_prompt(question_data: Dict[str, Any], model=None,
+                          cache: Optional[ResponseCache] = None,
+                          resilience: Optional[ResilientCaller] = None,
+                          timeout: Optional[float] = None,
+                          fallback: str = "A clear, educational diagram for the math problem.") -> str:
     """
     Generate a detailed image prompt based on the question data.
     
     Args:
         question_data: Question data including image_prompt
+        model: Optional model object exposing generate_content (defaults to the shared Gemini model)
+        cache: Optional response cache to read from and write to
+        resilience: Optional retry/circuit-breaker policy for the model call
+        timeout: Optional per-request timeout in seconds
+        fallback: Text returned if the model call fails
         
     Returns:
         Detailed image prompt for Gemini
@@ -207,34 +641,20 @@ def generate_image_prompt(question_data: Dict[str, Any]) -> str:
         return ""
     
     # Create a detailed prompt for Gemini
-    prompt = f"""
-    Create a detailed description for generating an image for the following math question:
-    
-    QUESTION: {question_data['question']}
-    
-    BASE IMAGE PROMPT: {question_data['image_prompt']}
-    
-    Please provide a detailed, specific description that would help generate a clear, 
-    educational diagram or illustration for this math problem. Include specific details 
-    about what elements should be in the image, their arrangement, colors, labels, and any 
-    other relevant information. The image should be suitable for middle/high school students.
-    """
+    prompt = IMAGE_PROMPT.render(question=question_data['question'], image_prompt=question_data['image_prompt'])
     
     # Generate response from Gemini
-    try:
-        model = genai.GenerativeModel('gemini-1.5-pro')
-    except Exception as e:
-        print(f"Error initializing gemini-1.5-pro model for image prompt: {e}")
-        print("Falling back to gemini-pro model...")
-        model = genai.GenerativeModel('gemini-pro')
+    if model is None:
+        model = DEFAULT_MODEL_PROVIDER.get()
     
     try:
-        response = model.generate_content(prompt)
+        with METRICS.stage("image_prompt"):
+            response_text = generate_text(model, prompt, timeout=timeout, cache=cache, resilience=resilience)
     except Exception as e:
         print(f"Error generating image prompt: {e}")
-        return "A clear, educational diagram for the math problem."
+        return fallback
     
-    return response.text.strip()
+    return response_text.strip()
 
 # Function to create sample questions without using the API
 def create_sample_questions(with_image=True) -> List[Dict[str, Any]]:
@@ -322,13 +742,80 @@ def main():
     parser.add_argument('-v', '--verbose', action='store_true', help='Show verbose output')
     parser.add_argument('-i', '--image', action='store_true', help='Generate questions with image prompts')
     parser.add_argument('--no-image', action='store_true', help='Generate questions without image prompts')
+    parser.add_argument('-w', '--workers', type=int, default=4, help='Number of concurrent API requests (default: 4)')
+    parser.add_argument('--timeout', type=float, default=None, help='Per-request timeout in seconds')
+    parser.add_argument('--rate', type=float, default=None, help='Maximum API requests per second (default: unlimited)')
+    parser.add_argument('-b', '--batch-size', type=int, default=1, help='Number of questions to request per API call (default: 1)')
+    parser.add_argument('--cache-dir', type=str, default=DEFAULT_CACHE_DIR, help=f'Directory for cached API responses (default: {DEFAULT_CACHE_DIR})')
+    parser.add_argument('--no-cache', action='store_true', help='Do not read or write cached API responses')
+    parser.add_argument('--cache-max-mb', type=float, default=100, help='Maximum size of the response cache in MB (default: 100)')
+    parser.add_argument('--cache-max-age', type=float, default=30, help='Maximum age of cached responses in days (default: 30)')
+    parser.add_argument('--dedup-index', type=str, default=None, help='Near-duplicate index database; questions similar to stored ones are rejected')
+    parser.add_argument('--similarity-threshold', type=float, default=0.8, help='Similarity at or above which a question is a duplicate (default: 0.8)')
+    parser.add_argument('--regenerate-duplicates', action='store_true', help='Request a replacement for every rejected duplicate')
+    parser.add_argument('--plan', type=str, default=None, help='JSON coverage plan of target counts per curriculum entry and difficulty (replaces -n)')
+    parser.add_argument('--max-bucket-failures', type=int, default=3, help='With --plan, consecutive calls without a usable question before a topic and difficulty is abandoned (default: 3)')
+    parser.add_argument('--enrich-images', action='store_true', help='Rewrite image prompts with a detailed description, in parallel with generation')
+    parser.add_argument('--enrich-workers', type=int, default=4, help='Number of concurrent image prompt requests (default: 4)')
+    parser.add_argument('--curriculum-scope', type=str, default=None, help='Only offer the model curriculum entries under this subject, unit, topic or "subject -> unit" (shortens the prompt)')
+    parser.add_argument('--prompt-report', action='store_true', help='Print the size in characters and tokens of each prompt template and exit')
+    parser.add_argument('--check-answers', choices=['flag', 'reject'], default=None, help='Check each correct_option against the result computed in its explanation; flag or reject (and regenerate) mismatches')
+    parser.add_argument('--stream', action='store_true', help='Stream API responses and parse questions as they arrive')
+    parser.add_argument('--max-retries', type=int, default=4, help='Retries per API call for transient errors (default: 4)')
+    parser.add_argument('--retry-budget', type=int, default=None, help='Maximum retries across the whole run (default: unlimited)')
+    parser.add_argument('--breaker-cooldown', type=float, default=30, help='Seconds to pause all workers when the error rate spikes (default: 30)')
+    parser.add_argument('--fallback-to-samples', action='store_true', help='Substitute sample questions if API generation fails')
+    parser.add_argument('--metrics', action='store_true', help='Print per-stage timing histograms and token/cache/retry counters at the end')
+    parser.add_argument('--profile', type=str, default=None, help='Write a Chrome trace of pipeline stages (FILE.json) or a cProfile dump of the main and worker threads (any other name); implies --metrics')
+    parser.add_argument('--format', choices=['json', 'jsonl'], default='json', help='Output format: pretty JSON array or streamed JSON Lines (default: json)')
+    parser.add_argument('--fsync-every', type=int, default=10, help='Number of questions between fsyncs in jsonl mode (default: 10)')
+    parser.add_argument('--resume', action='store_true', help='In jsonl mode, skip question slots already present in the output file')
+    parser.add_argument('--finalize', type=str, default=None, help='In jsonl mode, also write the results as a pretty JSON array to this file')
     
     args = parser.parse_args()
+    if args.format != 'jsonl' and (args.resume or args.finalize):
+        parser.error("--resume and --finalize require --format jsonl")
+    if args.max_bucket_failures < 1:
+        parser.error("--max-bucket-failures must be at least 1")
+    if args.curriculum_scope is not None:
+        try:
+            scope_codes(args.curriculum_scope)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    # Report prompt sizes, counting tokens with the model when it is available
+    if args.prompt_report:
+        model = None
+        if not args.sample:
+            try:
+                model = DEFAULT_MODEL_PROVIDER.get()
+            except Exception as e:
+                print(f"Model unavailable, estimating token counts: {e}")
+        print(prompt_report([BASE_QUESTION_1, BASE_QUESTION_2], model=model, scope=args.curriculum_scope,
+                            batch_size=max(args.batch_size, 5)))
+        return
+    
+    # Set up instrumentation
+    profiler = None
+    if args.metrics or args.profile:
+        METRICS.enable(trace_path=args.profile if args.profile and args.profile.endswith('.json') else None)
+    if args.profile and not METRICS.tracing:
+        profiler = ThreadProfiler()
+        profiler.start()
     
     # Generate new questions
     base_questions = [BASE_QUESTION_1, BASE_QUESTION_2]
     num_questions_to_generate = args.num
     
+    # A coverage plan sets the number of questions per topic and difficulty
+    scheduler = None
+    if args.plan:
+        try:
+            scheduler = CurriculumScheduler(load_plan(args.plan), max_failures=args.max_bucket_failures)
+        except (OSError, ValueError) as e:
+            parser.error(f"Invalid plan {args.plan}: {e}")
+        num_questions_to_generate = scheduler.total_target
+    
     # Determine if we should include images
     with_image = True  # Default is to include images
     if args.no_image:
@@ -337,70 +824,164 @@ def main():
         with_image = True
     
     print(f"Generating {num_questions_to_generate} new math questions{'with images' if with_image else 'without images'}...")
-    generated_questions = []
+    
+    # Open the output writer; JSON Lines output is written as questions arrive
+    output_file = args.output
+    completed_orders = set()
+    if args.format == 'jsonl':
+        if args.resume:
+            completed_orders = read_completed_orders(output_file)
+            if completed_orders:
+                print(f"Resuming: {len(completed_orders)} questions already in {output_file}")
+                if scheduler is not None:
+                    from question_loader import QuestionLoader
+                    counted = scheduler.count_existing(QuestionLoader(output_file))
+                    print(f"{counted} of them count towards the plan")
+        writer = JsonlWriter(output_file, fsync_every=args.fsync_every, append=args.resume)
+    else:
+        writer = JsonArrayWriter(output_file)
+    
+    num_written = 0
+    first_question = None
+    all_duplicates = True
+    dedup_index = None
+    # Generated questions are only added to the dedup index once they are in the output file
+    unindexed = []
+    
+    def write_question(question):
+        nonlocal num_written, first_question, all_duplicates
+        if first_question is None:
+            first_question = question
+        elif question['question'] != first_question['question']:
+            all_duplicates = False
+        with METRICS.stage("write"):
+            writer.write(question)
+        num_written += 1
+    
+    def write_sample_questions():
+        sample_questions = create_sample_questions(with_image=with_image)
+        # If we need more questions than we have samples, duplicate the samples
+        while len(sample_questions) < num_questions_to_generate:
+            sample_questions.extend(create_sample_questions(with_image=with_image))
+        # Trim to the requested number
+        for question in sample_questions[:num_questions_to_generate]:
+            write_question(question)
     
     # Use sample questions if requested
     if args.sample:
         print("Using sample questions as requested.")
-        generated_questions = create_sample_questions(with_image=with_image)
-        # If we need more questions than we have samples, duplicate the samples
-        while len(generated_questions) < num_questions_to_generate:
-            generated_questions.extend(create_sample_questions(with_image=with_image))
-        # Trim to the requested number
-        generated_questions = generated_questions[:num_questions_to_generate]
+        write_sample_questions()
     else:
-        # Try to use the API first
+        cache = None
+        if not args.no_cache:
+            cache = ResponseCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024),
+                                  max_age_days=args.cache_max_age)
+        if args.dedup_index:
+            dedup_index = DuplicateIndex(args.dedup_index, threshold=args.similarity_threshold)
+        resilience = ResilientCaller(max_attempts=args.max_retries + 1, retry_budget=args.retry_budget,
+                                     breaker=CircuitBreaker(cooldown=args.breaker_cooldown))
+        
+        enrich_images = args.enrich_images and with_image
+        if scheduler is not None:
+            questions = iter_planned_questions(
+                base_questions, scheduler, workers=args.workers, timeout=args.timeout, rate=args.rate,
+                verbose=args.verbose, batch_size=args.batch_size, cache=cache, dedup_index=dedup_index,
+                resilience=resilience, stream=args.stream, enrich_images=enrich_images,
+                enrich_workers=args.enrich_workers, answer_check=args.check_answers,
+                first_order=max(completed_orders, default=0) + 1)
+        else:
+            questions = iter_questions_concurrently(
+                base_questions, num_questions_to_generate, workers=args.workers,
+                timeout=args.timeout, rate=args.rate, verbose=args.verbose,
+                batch_size=args.batch_size, cache=cache, skip_orders=completed_orders,
+                dedup_index=dedup_index, regenerate_duplicates=args.regenerate_duplicates,
+                resilience=resilience, stream=args.stream,
+                enrich_images=enrich_images, enrich_workers=args.enrich_workers,
+                answer_check=args.check_answers, curriculum_scope=args.curriculum_scope)
+        
+        api_error = None
         try:
-            # First attempt to generate using the API
-            for i in range(num_questions_to_generate):
-                if args.verbose:
-                    print(f"Generating question {i+1}/{num_questions_to_generate}...")
-                questions = generate_question(base_questions)
-                if questions:
-                    # If no-image is specified, remove image prompts
-                    if not with_image:
-                        for q in questions:
-                            q['image_prompt'] = ""
-                            q['image_alt'] = ""
-                    generated_questions.extend(questions)
-                    
-            # If we couldn't generate any questions or got duplicates, use sample questions
-            if not generated_questions or (len(generated_questions) > 1 and 
-                                          all(generated_questions[0]['question'] == q['question'] for q in generated_questions[1:])):
-                print("API generation failed or returned duplicates. Using sample questions instead.")
-                generated_questions = create_sample_questions(with_image=with_image)
-                # If we need more questions than we have samples, duplicate the samples
-                while len(generated_questions) < num_questions_to_generate:
-                    generated_questions.extend(create_sample_questions(with_image=with_image))
-                # Trim to the requested number
-                generated_questions = generated_questions[:num_questions_to_generate]
+            for question in questions:
+                # If no-image is specified, remove image prompts
+                if not with_image:
+                    question['image_prompt'] = ""
+                    question['image_alt'] = ""
+                write_question(question)
+                if dedup_index is not None:
+                    if args.format == 'jsonl':
+                        dedup_index.add(question)
+                    else:
+                        unindexed.append(question)
         except Exception as e:
+            api_error = e
             print(f"Error using API: {e}")
-            print("Using sample questions instead.")
-            generated_questions = create_sample_questions(with_image=with_image)
-            # If we need more questions than we have samples, duplicate the samples
-            while len(generated_questions) < num_questions_to_generate:
-                generated_questions.extend(create_sample_questions(with_image=with_image))
-            # Trim to the requested number
-            generated_questions = generated_questions[:num_questions_to_generate]
-    
-    # Save generated questions to file
-    if generated_questions:
-        output_file = args.output
-        with open(output_file, "w") as f:
-            json.dump(generated_questions, f, indent=2)
+        finally:
+            if scheduler is not None:
+                print("\nPlan coverage:")
+                print(scheduler.report())
+            print(resilience.summary())
+            METRICS.count("retries", resilience.retries)
+            if cache is not None:
+                if args.verbose:
+                    print(f"Response cache: {cache.hits} hits, {cache.misses} misses")
+                cache.close()
         
-        print(f"Successfully generated {len(generated_questions)} questions.")
+        # Sample questions are only substituted for API output when explicitly allowed
+        nothing_generated = num_written == 0 and not completed_orders
+        duplicates_only = args.format == 'json' and num_written > 1 and all_duplicates
+        if api_error is not None or nothing_generated or duplicates_only:
+            if not args.fallback_to_samples:
+                if nothing_generated or duplicates_only:
+                    print("API generation failed or returned duplicates; not substituting sample questions "
+                          "(use --fallback-to-samples to allow it).")
+            elif args.format == 'json':
+                print("Using sample questions instead.")
+                writer.questions = []
+                unindexed = []
+                num_written = 0
+                write_sample_questions()
+            elif nothing_generated:
+                # Streamed output has already been written, so only an empty run falls back
+                print("Using sample questions instead.")
+                write_sample_questions()
+    
+    with METRICS.stage("write"):
+        writer.close()
+    if dedup_index is not None:
+        for question in unindexed:
+            dedup_index.add(question)
+        print(f"Rejected {dedup_index.duplicates} near-duplicate questions.")
+        dedup_index.close()
+    
+    # Report instrumentation
+    if profiler is not None:
+        profiler.stop()
+        profiler.dump_stats(args.profile)
+        print(f"cProfile data saved to {args.profile}")
+    elif METRICS.tracing:
+        METRICS.close_trace()
+        print(f"Chrome trace saved to {args.profile}")
+    if METRICS.enabled:
+        print("\nPipeline metrics:")
+        print(METRICS.report())
+    
+    # Report the saved questions
+    if num_written or completed_orders:
+        print(f"Successfully generated {num_written} questions.")
         print(f"Questions saved to {output_file}")
         
+        if args.format == 'jsonl' and args.finalize:
+            count = finalize_jsonl(output_file, args.finalize)
+            print(f"Wrote {count} questions as a JSON array to {args.finalize}")
+        
         # Print the first generated question as an example if verbose
-        if args.verbose:
+        if args.verbose and first_question is not None:
             print("\nExample generated question:")
-            print(json.dumps(generated_questions[0], indent=2))
-        else:
+            print(json.dumps(first_question, indent=2))
+        elif not args.verbose:
             print("\nGeneration complete. Use -v flag to see example output.")
     else:
         print("Failed to generate questions.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
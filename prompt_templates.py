@@ -0,0 +1,264 @@
+import math
+import string
+import textwrap
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from curriculum import ALLOWED_CURRICULUM, CURRICULUM_ENTRIES, CURRICULUM_SEPARATOR
+
+# Key the model fills with a curriculum code instead of subject/unit/topic
+CURRICULUM_CODE_KEY = "curriculum"
+
+# Curriculum code (1-based position in ALLOWED_CURRICULUM) for every entry
+CURRICULUM_CODES = {entry: code for code, entry in enumerate(ALLOWED_CURRICULUM, 1)}
+
+# Characters per token used when the model cannot count tokens itself
+CHARS_PER_TOKEN = 4
+
+class PromptTemplate:
+    """
+    Prompt text with its static parts substituted once.
+
+    The template uses str.format placeholders. Static values are folded into
+    the literal text when the template is compiled, leaving a list of literal
+    chunks and dynamic field names, so render() is a single join.
+
+    Args:
+        text: Template text; common leading indentation is removed
+        **static: Values substituted at compile time
+    """
+
+    def __init__(self, text: str, **static: Any):
+        self.parts: List[Tuple[str, Optional[str]]] = []
+        literal = []
+        for text_part, field, _, _ in string.Formatter().parse(textwrap.dedent(text).strip() + "\n"):
+            literal.append(text_part)
+            if field is None:
+                continue
+            if field in static:
+                literal.append(str(static[field]))
+            else:
+                self.parts.append(("".join(literal), field))
+                literal = []
+        self.parts.append(("".join(literal), None))
+        self.fields = tuple(field for _, field in self.parts if field is not None)
+
+    def render(self, **values: Any) -> str:
+        """Return the prompt with the dynamic fields filled in."""
+        pieces = []
+        for literal, field in self.parts:
+            pieces.append(literal)
+            if field is not None:
+                pieces.append(str(values[field]))
+        return "".join(pieces)
+
+QUESTION_TEMPLATE = """
+    You are an expert math teacher creating multiple-choice questions (MCQs) for middle/high school students.
+
+    I'll provide you with two base math questions. Your task is to create {num_questions} new, original math question(s) that are {similarity}.
+
+    BASE QUESTIONS:
+    {base_question_1}
+
+    {base_question_2}
+
+    REQUIREMENTS FOR THE OUTPUT:
+    - Output ONLY {output_format} with these keys:
+    {{"title": string (assessment title), "description": string, "question": string, "instruction": string, "difficulty": "easy"|"moderate"|"hard", "order": int, "options": [4-5 strings], "correct_option": string (exactly one option's text), "explanation": string (worked solution), "curriculum": int (curriculum code), "plusmarks": 1, "image_prompt": string (diagram description, "" if none), "image_alt": string}}
+    {curriculum_rule}
+    - Make the question clear for a middle/high-school audience, include only necessary numbers.
+    - Ensure exactly one option is correct.
+    - If the question requires an image, provide a detailed image_prompt that describes what should be in the image.
+    - Preserve any LaTeX formatting for equations and formulas.
+    - Keep JSON compact and valid. Use double quotes.
+"""
+
+IMAGE_PROMPT_TEMPLATE = """
+    Create a detailed description for generating an image for the following math question:
+
+    QUESTION: {question}
+
+    BASE IMAGE PROMPT: {image_prompt}
+
+    Please provide a detailed, specific description that would help generate a clear, educational diagram or illustration for this math problem. Include specific details about what elements should be in the image, their arrangement, colors, labels, and any other relevant information. The image should be suitable for middle/high school students.
+"""
+
+def scope_codes(scope: Optional[str] = None) -> List[int]:
+    """
+    Return the curriculum codes within a scope.
+
+    Args:
+        scope: None for the whole curriculum, or a subject, unit or topic name,
+            or a "subject -> unit" (or full curriculum entry) prefix
+
+    Returns:
+        Curriculum codes in curriculum order
+
+    Raises:
+        ValueError: If no curriculum entry falls within the scope
+    """
+    if scope is None:
+        return list(CURRICULUM_CODES.values())
+    codes = [code for entry, code in CURRICULUM_CODES.items()
+             if entry == scope or entry.startswith(scope + CURRICULUM_SEPARATOR)
+             or scope in entry.split(CURRICULUM_SEPARATOR)]
+    if not codes:
+        raise ValueError(f"No curriculum entries match {scope!r}")
+    return codes
+
+def encode_curriculum(codes: Sequence[int]) -> str:
+    """
+    Return a compact listing of curriculum entries with their codes.
+
+    Entries are grouped by subject and unit, one line per unit, e.g.
+    "Quantitative Math > Algebra: 6 Algebraic Word Problems; 7 Interpreting Variables".
+    """
+    lines = []
+    current = None
+    for code in codes:
+        subject, unit, topic = CURRICULUM_ENTRIES[code - 1]
+        if (subject, unit) != current:
+            current = (subject, unit)
+            lines.append(f"{subject} > {unit}: {code} {topic}")
+        else:
+            lines[-1] += f"; {code} {topic}"
+    return "\n".join(lines)
+
+def decode_curriculum(question: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Replace a curriculum code in a model response with subject, unit and topic.
+
+    The three keys take the code's place, so the key order matches the
+    output schema. Questions without a valid code are returned unchanged.
+    """
+    code = question.get(CURRICULUM_CODE_KEY)
+    if isinstance(code, str) and code.strip().isdigit():
+        code = int(code)
+    if type(code) is not int or not 1 <= code <= len(CURRICULUM_ENTRIES):
+        return question
+    subject, unit, topic = CURRICULUM_ENTRIES[code - 1]
+    decoded = {}
+    for key, value in question.items():
+        if key == CURRICULUM_CODE_KEY:
+            decoded.update(subject=subject, unit=unit, topic=topic)
+        else:
+            decoded[key] = value
+    return decoded
+
+class QuestionPromptBuilder:
+    """
+    Compiled question generation prompt for one pair of base questions.
+
+    The base questions and the (optionally scoped) curriculum listing are
+    substituted once; rendering only fills in the question count, the output
+    format and, for targeted requests, the required topic and difficulty.
+
+    Args:
+        base_questions: The two base questions used as reference
+        scope: Optional curriculum scope (see scope_codes) limiting the entries listed to the model
+    """
+
+    def __init__(self, base_questions: Sequence[str], scope: Optional[str] = None):
+        self.scope = scope
+        self.codes = scope_codes(scope)
+        self.curriculum_listing = encode_curriculum(self.codes)
+        self.template = PromptTemplate(QUESTION_TEMPLATE, base_question_1=base_questions[0].strip(),
+                                       base_question_2=base_questions[1].strip())
+        self._curriculum_rule = ('- "curriculum" MUST be the code of the best-fitting entry in this curriculum '
+                                 '(Subject > Unit: code Topic; ...):\n' + self.curriculum_listing)
+
+    def render(self, num_questions: int = 1, curriculum: Optional[str] = None,
+               difficulty: Optional[str] = None) -> str:
+        """
+        Return the prompt text.
+
+        Args:
+            num_questions: Number of new questions to request
+            curriculum: Optional ALLOWED_CURRICULUM entry the questions must cover
+            difficulty: Optional difficulty the questions must have
+        """
+        # Ask for a JSON array when several questions are requested in one call
+        if num_questions > 1:
+            output_format = f"a JSON array of exactly {num_questions} objects (no extra text), each"
+        else:
+            output_format = "a single JSON object (no extra text)"
+
+        if curriculum is None and difficulty is None:
+            similarity = "similar in style, difficulty, and topic to these base questions"
+        else:
+            similarity = "similar in style to these base questions, but on the topic and difficulty required below"
+        if curriculum is None:
+            rule = self._curriculum_rule
+        else:
+            rule = (f'- "curriculum" MUST be {CURRICULUM_CODES[curriculum]} '
+                    f'({curriculum.replace(CURRICULUM_SEPARATOR, " > ")}); every question must be on this topic.')
+        if difficulty is not None:
+            rule += f'\n- Every question MUST have difficulty "{difficulty}".'
+        return self.template.render(num_questions=num_questions, similarity=similarity,
+                                    output_format=output_format, curriculum_rule=rule)
+
+@lru_cache(maxsize=32)
+def question_prompt_builder(base_questions: Tuple[str, ...], scope: Optional[str] = None) -> QuestionPromptBuilder:
+    """Return the compiled prompt builder for the base questions and scope (compiled on first use)."""
+    return QuestionPromptBuilder(base_questions, scope)
+
+# Compiled image prompt template
+IMAGE_PROMPT = PromptTemplate(IMAGE_PROMPT_TEMPLATE)
+
+def count_tokens(text: str, model=None) -> Tuple[int, bool]:
+    """
+    Count the tokens in text.
+
+    Uses the model's count_tokens when available, otherwise estimates
+    CHARS_PER_TOKEN characters per token.
+
+    Returns:
+        (token count, whether the count is exact)
+    """
+    if model is not None and hasattr(model, "count_tokens"):
+        try:
+            return int(model.count_tokens(text).total_tokens), True
+        except Exception:
+            pass
+    return math.ceil(len(text) / CHARS_PER_TOKEN), False
+
+def prompt_report(base_questions: Sequence[str], model=None, scope: Optional[str] = None,
+                  batch_size: int = 5) -> str:
+    """
+    Return a table of the size of every prompt template.
+
+    The legacy curriculum row is the Python list repr that was previously
+    embedded in every question prompt, for comparison with the compact listing.
+
+    Args:
+        base_questions: The two base questions used as reference
+        model: Optional model whose count_tokens gives exact counts
+        scope: Optional curriculum scope to include a scoped prompt
+        batch_size: Question count for the batch prompt row
+    """
+    builder = question_prompt_builder(tuple(base_questions))
+    sample_topic = ALLOWED_CURRICULUM[0]
+    rows = [
+        ("question", builder.render(1)),
+        (f"question x{batch_size}", builder.render(batch_size)),
+        ("question (planned topic)", builder.render(1, curriculum=sample_topic, difficulty="easy")),
+    ]
+    if scope is not None:
+        rows.append((f"question ({scope})", question_prompt_builder(tuple(base_questions), scope).render(1)))
+    rows += [
+        ("image prompt", IMAGE_PROMPT.render(question="", image_prompt="")),
+        ("curriculum (compact)", builder.curriculum_listing),
+        ("curriculum (legacy)", str(ALLOWED_CURRICULUM)),
+    ]
+    exact = True
+    lines = [f"{'template':<32}{'chars':>8}{'tokens':>8}"]
+    for name, text in rows:
+        tokens, counted = count_tokens(text, model)
+        if not counted:
+            # Do not retry a model that cannot count tokens (e.g. no API access)
+            exact = False
+            model = None
+        lines.append(f"{name:<32}{len(text):>8}{tokens:>8}")
+    if not exact:
+        lines.append(f"(token counts estimated at {CHARS_PER_TOKEN} characters per token)")
+    return "\n".join(lines)
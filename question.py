@@ -0,0 +1,134 @@
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+from question_validator import DIFFICULTY_LEVELS, REQUIRED_QUESTION_KEYS
+
+# A question's difficulty is stored as an index into DIFFICULTY_LEVELS
+_DIFFICULTY_CODES = {name: code for code, name in enumerate(DIFFICULTY_LEVELS)}
+
+# Schema fields are stored in slots; any other key goes in the extra dict
+_FIELD_SET = frozenset(REQUIRED_QUESTION_KEYS)
+
+# Fields whose values repeat across many questions and are interned so they share one string object
+INTERNED_FIELDS = ("title", "description", "instruction", "subject", "unit", "topic")
+
+# Shared key-order tuples; most questions use one of a handful of layouts
+_KEY_ORDERS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+class Question:
+    """
+    Compact in-memory form of a question object.
+
+    Schema fields are held in slots instead of a per-question dict, repeated
+    categorical strings (subject, unit, topic, title, ...) are interned, a
+    known difficulty is stored as a small integer code and the position of the
+    correct option is computed once. from_dict/to_dict round-trip losslessly:
+    missing fields, unknown extra keys and the original key order are all
+    preserved. Fields missing from the source object read as None.
+    """
+
+    __slots__ = (
+        "title", "description", "question", "instruction", "_difficulty", "_other_difficulty", "order",
+        "options", "correct_index", "_correct_option", "explanation", "subject", "unit", "topic",
+        "plusmarks", "image_prompt", "image_alt", "extra", "_keys"
+    )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Question":
+        """
+        Build a Question from a question object in the JSON schema.
+
+        Args:
+            data: Question object (not modified)
+
+        Returns:
+            Question holding the same data
+        """
+        self = cls.__new__(cls)
+        keys = tuple(data)
+        self._keys = _KEY_ORDERS.setdefault(keys, keys)
+
+        for field in INTERNED_FIELDS:
+            value = data.get(field)
+            setattr(self, field, sys.intern(value) if type(value) is str else value)
+        self.question = data.get("question")
+        self.order = data.get("order")
+        self.explanation = data.get("explanation")
+        self.plusmarks = data.get("plusmarks")
+        self.image_prompt = data.get("image_prompt")
+        self.image_alt = data.get("image_alt")
+
+        # Only known levels are encoded; any other value is kept as is so it round-trips unchanged
+        difficulty = data.get("difficulty")
+        code = _DIFFICULTY_CODES.get(difficulty) if type(difficulty) is str else None
+        self._difficulty = -1 if code is None else code
+        self._other_difficulty = difficulty if code is None else None
+
+        # Options are kept as a tuple; anything other than a list is stored unchanged
+        options = data.get("options")
+        self.options = tuple(options) if type(options) is list else options
+        correct_option = data.get("correct_option")
+        self.correct_index = -1
+        if type(self.options) is tuple:
+            for index, option in enumerate(self.options):
+                if option == correct_option and type(option) is type(correct_option):
+                    self.correct_index = index
+                    break
+        # The correct option shares the option's string object when it matches one
+        self._correct_option = None if self.correct_index >= 0 else correct_option
+
+        extra = {key: value for key, value in data.items() if key not in _FIELD_SET}
+        self.extra = extra or None
+        return self
+
+    @property
+    def difficulty(self) -> Any:
+        return DIFFICULTY_LEVELS[self._difficulty] if self._difficulty >= 0 else self._other_difficulty
+
+    @property
+    def difficulty_code(self) -> int:
+        """Index of the difficulty in DIFFICULTY_LEVELS, or -1 for an unknown difficulty."""
+        return self._difficulty
+
+    @property
+    def correct_option(self) -> Any:
+        return self.options[self.correct_index] if self.correct_index >= 0 else self._correct_option
+
+    @property
+    def correct_letter(self) -> Optional[str]:
+        """Letter (A, B, ...) of the correct option, or None if it matches no option."""
+        return chr(65 + self.correct_index) if self.correct_index >= 0 else None
+
+    @property
+    def has_image(self) -> bool:
+        return bool(self.get("image_prompt"))
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._keys:
+            raise KeyError(key)
+        if key not in _FIELD_SET:
+            return self.extra[key]
+        value = getattr(self, key)
+        # Hand out a list, as in the JSON schema, so callers cannot tell the difference
+        return list(value) if key == "options" and type(value) is tuple else value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the value of a field or extra key, like dict.get."""
+        return self[key] if key in self._keys else default
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the question object in the JSON schema, with its original key order."""
+        return {key: self[key] for key in self._keys}
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, Question):
+            return self.to_dict() == other.to_dict()
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"Question(order={self.get('order')!r}, question={str(self.get('question', ''))[:40]!r})"
@@ -0,0 +1,270 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from question_validator import validate_question
+
+# Default location of the question bank
+DEFAULT_QUESTION_BANK = "question_bank.sqlite3"
+
+# Questions inserted per transaction when importing
+IMPORT_BATCH_SIZE = 5000
+
+# Questions fetched per query page
+QUERY_PAGE_SIZE = 500
+
+# Secondary indexes covering the supported filters; SQLite picks the best one per query
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS questions_curriculum ON questions (subject, unit, topic, difficulty, has_image)",
+    "CREATE INDEX IF NOT EXISTS questions_unit ON questions (unit, topic, difficulty)",
+    "CREATE INDEX IF NOT EXISTS questions_topic ON questions (topic, difficulty)",
+    "CREATE INDEX IF NOT EXISTS questions_difficulty ON questions (difficulty, has_image)",
+)
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query matching rows that contain every word."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+class QuestionBank:
+    """
+    Persistent, indexed store of generated questions.
+
+    Each question is stored as its original JSON alongside the columns used
+    for filtering (subject, unit, topic, difficulty, has_image), which are
+    covered by B-tree indexes. The question and explanation text is indexed
+    with SQLite's FTS5 full-text search when the sqlite3 build supports it
+    (falling back to a slower substring scan otherwise). Questions are keyed by
+    a hash of their content, so importing the same file twice adds nothing.
+
+    Args:
+        path: SQLite database file holding the bank
+    """
+
+    def __init__(self, path: str = DEFAULT_QUESTION_BANK):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS questions ("
+            "id INTEGER PRIMARY KEY, digest BLOB NOT NULL UNIQUE, "
+            "subject TEXT, unit TEXT, topic TEXT, difficulty TEXT, has_image INTEGER NOT NULL, "
+            "question TEXT, explanation TEXT, data TEXT NOT NULL)"
+        )
+        for statement in _INDEXES:
+            self._conn.execute(statement)
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS questions_fts USING fts5("
+                "question, explanation, content='questions', content_rowid='id')"
+            )
+            self.has_fts = True
+        except sqlite3.OperationalError:
+            self.has_fts = False
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM questions").fetchone()[0]
+
+    def add(self, questions: Iterable[Dict[str, Any]]) -> Tuple[int, int]:
+        """
+        Store questions in one transaction, skipping ones already in the bank.
+
+        Returns:
+            (number added, number already present)
+        """
+        added = 0
+        existing = 0
+        with self._lock:
+            with self._conn:
+                for question in questions:
+                    data = json.dumps(question, ensure_ascii=False, separators=(",", ":"))
+                    digest = hashlib.blake2b(data.encode("utf-8"), digest_size=16).digest()
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO questions (digest, subject, unit, topic, difficulty, has_image, "
+                        "question, explanation, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (digest, question.get("subject"), question.get("unit"), question.get("topic"),
+                         question.get("difficulty"), int(bool(question.get("image_prompt"))),
+                         question.get("question"), question.get("explanation"), data)
+                    )
+                    if not cursor.rowcount:
+                        existing += 1
+                        continue
+                    added += 1
+                    if self.has_fts:
+                        self._conn.execute(
+                            "INSERT INTO questions_fts (rowid, question, explanation) VALUES (?, ?, ?)",
+                            (cursor.lastrowid, question.get("question"), question.get("explanation"))
+                        )
+        return added, existing
+
+    def import_file(self, path: str, batch_size: int = IMPORT_BATCH_SIZE) -> Tuple[int, int, int]:
+        """
+        Import a JSON array or JSON Lines question file.
+
+        Questions are streamed from the file and inserted in batches, so memory
+        use stays constant. Questions that fail validation are skipped.
+
+        Args:
+            path: Path to a .json (array) or .jsonl file
+            batch_size: Questions inserted per transaction
+
+        Returns:
+            (number added, number already present, number invalid)
+        """
+        from question_loader import QuestionLoader
+
+        added = existing = invalid = 0
+        batch = []
+        for question in QuestionLoader(path):
+            if validate_question(question):
+                invalid += 1
+                continue
+            batch.append(question)
+            if len(batch) >= batch_size:
+                counts = self.add(batch)
+                added += counts[0]
+                existing += counts[1]
+                batch = []
+        counts = self.add(batch)
+        # Refresh planner statistics so multi-column filters pick the most selective index
+        with self._lock:
+            self._conn.execute("ANALYZE")
+        return added + counts[0], existing + counts[1], invalid
+
+    def _where(self, subject: Optional[str], unit: Optional[str], topic: Optional[str],
+               difficulty: Optional[str], has_image: Optional[bool], text: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses = []
+        params: List[Any] = []
+        for column, value in (("subject", subject), ("unit", unit), ("topic", topic), ("difficulty", difficulty)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if has_image is not None:
+            clauses.append("has_image = ?")
+            params.append(int(has_image))
+        if text:
+            if self.has_fts:
+                clauses.append("id IN (SELECT rowid FROM questions_fts WHERE questions_fts MATCH ?)")
+                params.append(fts_query(text))
+            else:
+                for word in text.split():
+                    clauses.append("(question LIKE ? OR explanation LIKE ?)")
+                    params.extend([f"%{word}%"] * 2)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, subject: Optional[str] = None, unit: Optional[str] = None, topic: Optional[str] = None,
+              difficulty: Optional[str] = None, has_image: Optional[bool] = None, text: Optional[str] = None,
+              limit: Optional[int] = None, offset: int = 0, raw: bool = False) -> Iterator[Any]:
+        """
+        Yield stored questions matching every given filter, in insertion order.
+
+        Args:
+            subject: Exact subject
+            unit: Exact unit
+            topic: Exact topic
+            difficulty: Exact difficulty
+            has_image: Whether the question must (True) or must not (False) have an image prompt
+            text: Words that must all appear in the question or explanation
+            limit: Maximum number of questions to return
+            offset: Number of matching questions to skip
+            raw: Yield the stored JSON text instead of decoding it
+
+        Yields:
+            Question objects exactly as imported (JSON strings if raw)
+        """
+        where, params = self._where(subject, unit, topic, difficulty, has_image, text)
+        # Fetch in pages keyed on id, so huge result sets are neither loaded at
+        # once nor hold the connection while the caller consumes them
+        next_where = where + (" AND" if where else " WHERE") + " id > ?"
+        remaining = limit
+        last_id = None
+        while remaining is None or remaining > 0:
+            page_size = QUERY_PAGE_SIZE if remaining is None else min(QUERY_PAGE_SIZE, remaining)
+            with self._lock:
+                if last_id is None:
+                    page = self._conn.execute(f"SELECT id, data FROM questions{where} ORDER BY id LIMIT ? OFFSET ?",
+                                              params + [page_size, max(0, offset)]).fetchall()
+                else:
+                    page = self._conn.execute(f"SELECT id, data FROM questions{next_where} ORDER BY id LIMIT ?",
+                                              params + [last_id, page_size]).fetchall()
+            for _, data in page:
+                yield data if raw else json.loads(data)
+            if len(page) < page_size:
+                return
+            last_id = page[-1][0]
+            if remaining is not None:
+                remaining -= len(page)
+
+    def count(self, subject: Optional[str] = None, unit: Optional[str] = None, topic: Optional[str] = None,
+              difficulty: Optional[str] = None, has_image: Optional[bool] = None, text: Optional[str] = None) -> int:
+        """Return the number of stored questions matching every given filter (see query)."""
+        where, params = self._where(subject, unit, topic, difficulty, has_image, text)
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM questions{where}", params).fetchone()[0]
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+def add_query_arguments(parser) -> None:
+    """Add the query filter options shared by the command-line tools to an argparse parser."""
+    from question_validator import DIFFICULTIES
+
+    parser.add_argument('--subject', type=str, default=None, help='Only questions with this subject')
+    parser.add_argument('--unit', type=str, default=None, help='Only questions in this unit')
+    parser.add_argument('--topic', type=str, default=None, help='Only questions on this topic')
+    parser.add_argument('--difficulty', choices=sorted(DIFFICULTIES), default=None, help='Only questions of this difficulty')
+    parser.add_argument('--has-image', dest='has_image', action='store_true', default=None, help='Only questions with an image prompt')
+    parser.add_argument('--no-image', dest='has_image', action='store_false', help='Only questions without an image prompt')
+    parser.add_argument('--text', type=str, default=None, help='Words that must all appear in the question or explanation')
+
+def query_filters(args) -> Dict[str, Any]:
+    """Return the query() keyword arguments selected by add_query_arguments options."""
+    return {key: getattr(args, key) for key in ("subject", "unit", "topic", "difficulty", "has_image", "text")}
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Import questions into an indexed question bank and query it.')
+    parser.add_argument('--bank', type=str, default=DEFAULT_QUESTION_BANK, help=f'Question bank database path (default: {DEFAULT_QUESTION_BANK})')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = commands.add_parser('import', help='Import question files (.json or .jsonl)')
+    import_parser.add_argument('files', nargs='+', help='Question files (.json or .jsonl)')
+
+    query_parser = commands.add_parser('query', help='Print questions matching the filters')
+    add_query_arguments(query_parser)
+    query_parser.add_argument('--limit', type=int, default=None, help='Maximum number of questions to print')
+    query_parser.add_argument('--offset', type=int, default=0, help='Number of matching questions to skip')
+    query_parser.add_argument('--count', action='store_true', help='Only print the number of matching questions')
+    query_parser.add_argument('--format', choices=['json', 'jsonl'], default='jsonl', help='Output format (default: jsonl)')
+    args = parser.parse_args()
+
+    bank = QuestionBank(args.bank)
+    if args.command == 'import':
+        for questions_file in args.files:
+            start_time = time.perf_counter()
+            added, existing, invalid = bank.import_file(questions_file)
+            elapsed = time.perf_counter() - start_time
+            print(f"{questions_file}: added {added}, already present {existing}, invalid {invalid} ({elapsed:.2f}s)")
+        print(f"Bank now holds {len(bank)} questions.")
+    elif args.count:
+        print(bank.count(**query_filters(args)))
+    else:
+        questions = bank.query(limit=args.limit, offset=args.offset, **query_filters(args))
+        if args.format == 'json':
+            print(json.dumps(list(questions), indent=2, ensure_ascii=False))
+        else:
+            for question in questions:
+                print(json.dumps(question, ensure_ascii=False))
+    bank.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+import codecs
+import json
+import os
+import struct
+from typing import Any, Dict, Iterator, Tuple
+
+# Sidecar index layout: header (magic, source size, source mtime, count) followed by (start, end) pairs
+INDEX_MAGIC = b"MCQIDX1\0"
+INDEX_HEADER = struct.Struct("<8sQqQ")
+INDEX_ENTRY = struct.Struct("<QQ")
+
+# Amount of the file read at a time when parsing JSON arrays incrementally
+CHUNK_SIZE = 1 << 20
+
+_WHITESPACE = " \t\r\n"
+
+class QuestionLoader:
+    """
+    Lazily iterate the questions stored in a JSON array or JSON Lines file.
+
+    Questions are parsed one at a time from fixed-size chunks of the file, so
+    memory use stays constant regardless of the bank size. Random access by
+    position goes through a sidecar offset index (<path>.idx) that is built on
+    first use and rebuilt whenever the file changes.
+
+    Args:
+        path: Path to a .json (array) or .jsonl file
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.is_jsonl = self._detect_jsonl()
+
+    def _detect_jsonl(self) -> bool:
+        if self.path.endswith(".jsonl"):
+            return True
+        with open(self.path, "rb") as f:
+            head = f.read(4096).lstrip()
+        return not head.startswith(b"[")
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_from(0)
+
+    def __len__(self) -> int:
+        self.ensure_index()
+        with open(self.index_path, "rb") as f:
+            return INDEX_HEADER.unpack(f.read(INDEX_HEADER.size))[3]
+
+    def __getitem__(self, position: int) -> Dict[str, Any]:
+        self.ensure_index()
+        with open(self.index_path, "rb") as index:
+            count = INDEX_HEADER.unpack(index.read(INDEX_HEADER.size))[3]
+            if not 0 <= position < count:
+                raise IndexError(f"question {position} out of range (0-{count - 1})")
+            index.seek(INDEX_HEADER.size + position * INDEX_ENTRY.size)
+            start, end = INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            return json.loads(f.read(end - start))
+
+    def iter_from(self, position: int) -> Iterator[Dict[str, Any]]:
+        """
+        Yield questions starting at the given 0-based position.
+
+        Args:
+            position: Index of the first question to yield
+
+        Yields:
+            Question objects
+        """
+        if position <= 0:
+            for question, _, _ in self._iter_records():
+                yield question
+            return
+
+        self.ensure_index()
+        with open(self.index_path, "rb") as index, open(self.path, "rb") as f:
+            count = INDEX_HEADER.unpack(index.read(INDEX_HEADER.size))[3]
+            index.seek(INDEX_HEADER.size + position * INDEX_ENTRY.size)
+            for _ in range(position, count):
+                start, end = INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))
+                f.seek(start)
+                yield json.loads(f.read(end - start))
+
+    def iter_raw(self) -> Iterator[bytes]:
+        """
+        Yield the undecoded JSON text of every question, in file order.
+
+        Useful for handing questions to other processes without parsing them
+        here. JSON arrays are read through the offset index.
+        """
+        if self.is_jsonl:
+            with open(self.path, "rb") as f:
+                for line in f:
+                    if line.strip():
+                        yield line
+            return
+
+        self.ensure_index()
+        with open(self.index_path, "rb") as index, open(self.path, "rb") as f:
+            count = INDEX_HEADER.unpack(index.read(INDEX_HEADER.size))[3]
+            for _ in range(count):
+                start, end = INDEX_ENTRY.unpack(index.read(INDEX_ENTRY.size))
+                f.seek(start)
+                yield f.read(end - start)
+
+    def ensure_index(self) -> None:
+        """Build the sidecar offset index if it is missing or stale."""
+        stat = os.stat(self.path)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                header = f.read(INDEX_HEADER.size)
+            if len(header) == INDEX_HEADER.size:
+                magic, size, mtime, _ = INDEX_HEADER.unpack(header)
+                if magic == INDEX_MAGIC and size == stat.st_size and mtime == stat.st_mtime_ns:
+                    return
+
+        count = 0
+        tmp_path = self.index_path + ".tmp"
+        with open(tmp_path, "wb") as index:
+            index.write(INDEX_HEADER.pack(INDEX_MAGIC, 0, 0, 0))
+            for start, end in self._iter_offsets():
+                index.write(INDEX_ENTRY.pack(start, end))
+                count += 1
+            index.seek(0)
+            index.write(INDEX_HEADER.pack(INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, count))
+        os.replace(tmp_path, self.index_path)
+
+    def _iter_records(self) -> Iterator[Tuple[Dict[str, Any], int, int]]:
+        if self.is_jsonl:
+            return _iter_jsonl(self.path)
+        return _iter_json_array(self.path)
+
+    def _iter_offsets(self) -> Iterator[Tuple[int, int]]:
+        if self.is_jsonl:
+            return _iter_jsonl_offsets(self.path)
+        return ((start, end) for _, start, end in _iter_json_array(self.path))
+
+def _iter_jsonl(path: str) -> Iterator[Tuple[Dict[str, Any], int, int]]:
+    """Yield (question, start, end) for every non-blank line of a JSON Lines file."""
+    offset = 0
+    with open(path, "rb") as f:
+        for line in f:
+            start = offset
+            offset += len(line)
+            if line.strip():
+                yield json.loads(line), start, start + len(line.rstrip(b"\r\n"))
+
+def _iter_jsonl_offsets(path: str) -> Iterator[Tuple[int, int]]:
+    """
+    Yield (start, end) for every non-blank line of a JSON Lines file.
+
+    Lines are found by scanning fixed-size chunks for newlines and nothing is
+    decoded, so building the index costs little more than reading the file.
+    A trailing carriage return is left inside the range; json.loads ignores it.
+    """
+    with open(path, "rb") as f:
+        start = 0  # byte offset of the current line
+        blank = True  # whether the current line is whitespace so far
+        offset = 0  # byte offset of chunk[0]
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            pos = 0
+            while True:
+                newline = chunk.find(b"\n", pos)
+                if blank:
+                    blank = not chunk[pos:newline if newline >= 0 else len(chunk)].strip()
+                if newline < 0:
+                    break
+                if not blank:
+                    yield start, offset + newline
+                pos = newline + 1
+                start = offset + pos
+                blank = True
+            offset += len(chunk)
+        if not blank:
+            yield start, offset
+
+def _iter_json_array(path: str) -> Iterator[Tuple[Dict[str, Any], int, int]]:
+    """
+    Yield (question, start, end) for every element of a top-level JSON array.
+
+    The file is decoded in chunks and each element is parsed with the C JSON
+    decoder; byte offsets are tracked alongside the text position so that the
+    offset index can seek straight to an element.
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    with open(path, "rb") as f:
+        buf = ""
+        pos = 0
+        offset = 0  # byte offset of buf[pos]
+        eof = False
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof
+            if eof:
+                return False
+            chunk = f.read(CHUNK_SIZE)
+            eof = not chunk
+            buf = buf[pos:] + text_decoder.decode(chunk, final=eof)
+            pos = 0
+            return True
+
+        def advance(new_pos: int) -> None:
+            nonlocal pos, offset
+            offset += len(buf[pos:new_pos].encode("utf-8"))
+            pos = new_pos
+
+        def skip(chars: str) -> str:
+            # Skip the given characters and return the next one ("" at end of file)
+            while True:
+                end = pos
+                while end < len(buf) and buf[end] in chars:
+                    end += 1
+                advance(end)
+                if pos < len(buf) or not fill():
+                    return buf[pos:pos + 1]
+
+        if skip(_WHITESPACE) != "[":
+            raise ValueError("expected a JSON array")
+        advance(pos + 1)
+
+        while True:
+            char = skip(_WHITESPACE + ",")
+            if char == "]":
+                return
+            if char == "":
+                raise ValueError("unterminated JSON array")
+            try:
+                question, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                # Most likely the element straddles the chunk boundary
+                if fill():
+                    continue
+                raise
+            start = offset
+            advance(end)
+            yield question, start, offset
@@ -0,0 +1,125 @@
+import os
+import sys
+import time
+from typing import Any, List
+
+from curriculum import CURRICULUM_SET, CURRICULUM_TREE
+from question_loader import QuestionLoader
+
+# Keys every generated question must provide
+REQUIRED_QUESTION_KEYS = (
+    "title", "description", "question", "instruction", "difficulty", "order",
+    "options", "correct_option", "explanation", "subject", "unit", "topic",
+    "plusmarks", "image_prompt", "image_alt"
+)
+
+# Keys whose values must be strings
+STRING_KEYS = (
+    "title", "description", "question", "instruction", "correct_option", "explanation",
+    "subject", "unit", "topic", "image_prompt", "image_alt"
+)
+
+# Difficulty levels, from easiest to hardest
+DIFFICULTY_LEVELS = ("easy", "moderate", "hard")
+
+# Allowed difficulty levels
+DIFFICULTIES = frozenset(DIFFICULTY_LEVELS)
+
+# Allowed number of options
+MIN_OPTIONS = 4
+MAX_OPTIONS = 5
+
+def validate_question(question: Any) -> List[str]:
+    """
+    Check a question object against the output schema.
+    
+    Checks required keys, value types, the difficulty level, the number of
+    options, that correct_option matches exactly one option and that
+    subject/unit/topic is an allowed curriculum entry.
+    
+    Args:
+        question: Parsed question object
+        
+    Returns:
+        List of error messages (empty if the question is valid)
+    """
+    if not isinstance(question, dict):
+        return ["not a JSON object"]
+    
+    missing = [key for key in REQUIRED_QUESTION_KEYS if key not in question]
+    if missing:
+        return [f"missing keys {', '.join(missing)}"]
+    
+    errors = []
+    for key in STRING_KEYS:
+        if not isinstance(question[key], str):
+            errors.append(f"'{key}' must be a string")
+    if type(question["order"]) is not int:
+        errors.append("'order' must be an integer")
+    if type(question["plusmarks"]) not in (int, float):
+        errors.append("'plusmarks' must be a number")
+    
+    # A list or object would be unhashable, so check the type before the set lookup
+    if not isinstance(question["difficulty"], str) or question["difficulty"] not in DIFFICULTIES:
+        errors.append(f"invalid difficulty {question['difficulty']!r}")
+    
+    options = question["options"]
+    if not isinstance(options, list) or not all(isinstance(option, str) for option in options):
+        errors.append("'options' must be a list of strings")
+    else:
+        if not MIN_OPTIONS <= len(options) <= MAX_OPTIONS:
+            errors.append(f"expected {MIN_OPTIONS}-{MAX_OPTIONS} options, got {len(options)}")
+        matches = options.count(question["correct_option"])
+        if matches != 1:
+            errors.append(f"correct_option matches {matches} options")
+    
+    subject, unit, topic = question["subject"], question["unit"], question["topic"]
+    try:
+        allowed = (subject, unit, topic) in CURRICULUM_SET
+    except TypeError:
+        allowed = False
+    if not allowed:
+        units = CURRICULUM_TREE.get(subject) if isinstance(subject, str) else None
+        if units is None:
+            errors.append(f"subject {subject!r} is not in the curriculum")
+        elif not isinstance(unit, str) or unit not in units:
+            errors.append(f"unit {unit!r} is not in subject {subject!r}")
+        else:
+            errors.append(f"topic {topic!r} is not in unit {unit!r}")
+    
+    return errors
+
+def main():
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Validate generated math MCQ questions against the output schema.')
+    parser.add_argument('files', nargs='+', help='Question files (.json or .jsonl)')
+    parser.add_argument('-q', '--quiet', action='store_true', help='Only print the summary')
+    args = parser.parse_args()
+    
+    total = 0
+    invalid = 0
+    start_time = time.perf_counter()
+    for questions_file in args.files:
+        if not os.path.exists(questions_file):
+            print(f"Error: File '{questions_file}' not found.")
+            sys.exit(2)
+        try:
+            for number, question in enumerate(QuestionLoader(questions_file), 1):
+                total += 1
+                errors = validate_question(question)
+                if errors:
+                    invalid += 1
+                    if not args.quiet:
+                        print(f"{questions_file}: question {number}: {'; '.join(errors)}")
+        except ValueError as e:
+            print(f"Error: File '{questions_file}' is not a valid JSON or JSON Lines file: {e}")
+            sys.exit(2)
+    elapsed = time.perf_counter() - start_time
+    
+    rate = total / elapsed if elapsed > 0 else 0
+    print(f"Checked {total} questions in {elapsed:.2f}s ({rate:.0f} questions/s): {total - invalid} valid, {invalid} invalid.")
+    sys.exit(1 if invalid else 0)
+
+if __name__ == "__main__":
+    main()
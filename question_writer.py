@@ -0,0 +1,132 @@
+import json
+import os
+from typing import Any, Dict, List, Set
+
+from question import Question
+
+class JsonArrayWriter:
+    """
+    Collect questions in memory and write them as a pretty JSON array on close.
+
+    Questions are held in compact Question form until then and written one at
+    a time, producing the same output as json.dump(questions, f, indent=2).
+
+    Args:
+        path: Output file path
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.questions: List[Question] = []
+
+    def write(self, question: Dict[str, Any]) -> None:
+        self.questions.append(Question.from_dict(question))
+
+    def close(self) -> None:
+        if self.questions:
+            with open(self.path, "w") as f:
+                f.write("[")
+                separator = "\n  "
+                for question in self.questions:
+                    f.write(separator)
+                    f.write(json.dumps(question.to_dict(), indent=2).replace("\n", "\n  "))
+                    separator = ",\n  "
+                f.write("\n]")
+
+class JsonlWriter:
+    """
+    Append questions to a JSON Lines file as soon as they are produced.
+
+    Every question is flushed immediately and the file is fsynced every
+    fsync_every questions, so a crash loses at most the questions written since
+    the last sync.
+
+    Args:
+        path: Output file path
+        fsync_every: Number of questions between fsync calls
+        append: Whether to append to an existing file instead of truncating it
+    """
+
+    def __init__(self, path: str, fsync_every: int = 10, append: bool = False):
+        self.path = path
+        self.fsync_every = max(1, fsync_every)
+        self._pending = 0
+        self._file = open(path, "a" if append else "w", encoding="utf-8")
+
+    def write(self, question: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(question, ensure_ascii=False) + "\n")
+        self._file.flush()
+        self._pending += 1
+        if self._pending >= self.fsync_every:
+            self.sync()
+
+    def sync(self) -> None:
+        """Force written questions to disk."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._pending = 0
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+def read_completed_orders(path: str) -> Set[int]:
+    """
+    Scan an existing JSON Lines output file and return the 'order' slots it already contains.
+
+    A trailing partial line left behind by a crash is truncated away so that new
+    questions can be appended safely.
+
+    Args:
+        path: JSON Lines file path
+
+    Returns:
+        Set of completed 'order' values
+    """
+    completed: Set[int] = set()
+    if not os.path.exists(path):
+        return completed
+
+    valid_end = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if line.endswith(b"\n") and not line.strip():
+                valid_end += len(line)
+                continue
+            try:
+                question = json.loads(line) if line.endswith(b"\n") else None
+            except ValueError:
+                question = None
+            if question is None:
+                # Only a crash-truncated final line is expected; stop and cut it off
+                if not line.endswith(b"\n") or f.peek(1) == b"":
+                    break
+                print(f"Skipping malformed line in {path}")
+            valid_end += len(line)
+            if isinstance(question, dict) and isinstance(question.get("order"), int):
+                completed.add(question["order"])
+
+    if valid_end < os.path.getsize(path):
+        print(f"Truncating incomplete data at the end of {path}")
+        with open(path, "r+b") as f:
+            f.truncate(valid_end)
+    return completed
+
+def finalize_jsonl(jsonl_path: str, json_path: str) -> int:
+    """
+    Convert a JSON Lines output file into the pretty JSON array format, sorted by 'order'.
+
+    Args:
+        jsonl_path: JSON Lines file to read
+        json_path: JSON file to write
+
+    Returns:
+        Number of questions written
+    """
+    with open(jsonl_path, "r", encoding="utf-8") as f:
+        questions = [json.loads(line) for line in f if line.strip()]
+    questions.sort(key=lambda q: q.get("order", 0))
+    with open(json_path, "w") as f:
+        json.dump(questions, f, indent=2)
+    return len(questions)
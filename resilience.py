@@ -0,0 +1,169 @@
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Optional
+
+# Exception class names (from google.api_core and the standard library) worth retrying
+RETRYABLE_ERROR_NAMES = frozenset((
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded",
+    "InternalServerError", "GatewayTimeout", "BadGateway", "Aborted", "RetryError",
+    "TimeoutError", "ConnectionError", "ConnectionResetError", "ConnectionAbortedError",
+))
+
+# HTTP status codes worth retrying
+RETRYABLE_STATUS_CODES = frozenset((408, 429, 500, 502, 503, 504))
+
+# API error class names that fail every call (bad credentials, invalid requests, unknown model)
+FATAL_ERROR_NAMES = frozenset((
+    "Unauthenticated", "Unauthorized", "PermissionDenied", "Forbidden", "InvalidArgument",
+    "BadRequest", "NotFound", "FailedPrecondition", "DefaultCredentialsError",
+))
+
+# HTTP status codes that fail every call
+FATAL_STATUS_CODES = frozenset((400, 401, 403, 404))
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Return whether a model call failure is transient and worth retrying.
+
+    Rate limits, timeouts, connection problems and server errors are retryable;
+    anything else (invalid arguments, bad credentials, blocked responses, ...) is not.
+    """
+    if any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and code in RETRYABLE_STATUS_CODES
+
+def is_fatal(error: BaseException) -> bool:
+    """
+    Return whether a model call failure would fail every call, so the run should stop.
+
+    Only API errors about the credentials or the request itself are fatal.
+    Problems with a single response, such as a candidate blocked for safety or
+    recitation (the Gemini SDK raises ValueError reading its text, or
+    StopCandidateException while streaming), are not.
+    """
+    if any(cls.__name__ in FATAL_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    code = getattr(error, "code", None)
+    return isinstance(code, int) and code in FATAL_STATUS_CODES
+
+class CircuitBreaker:
+    """
+    Pause all callers when the recent error rate spikes.
+
+    The outcomes of the last `window` calls are tracked. Once at least
+    `min_calls` have been seen and the failure rate reaches `failure_threshold`,
+    the breaker opens and wait() blocks every caller for `cooldown` seconds;
+    after that the window is cleared and calls resume.
+
+    Args:
+        window: Number of recent calls to consider
+        failure_threshold: Failure rate (0-1) that opens the breaker
+        cooldown: Seconds to pause callers once the breaker opens
+        min_calls: Minimum number of recent calls before the breaker may open
+    """
+
+    def __init__(self, window: int = 20, failure_threshold: float = 0.5, cooldown: float = 30.0,
+                 min_calls: int = 5):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.min_calls = min_calls
+        self.trips = 0
+        self._outcomes = deque(maxlen=window)
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        """Block while the breaker is open."""
+        while True:
+            with self._lock:
+                remaining = self._open_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def record(self, success: bool) -> None:
+        """Record the outcome of a call and open the breaker if the failure rate is too high."""
+        with self._lock:
+            self._outcomes.append(success)
+            if len(self._outcomes) < self.min_calls:
+                return
+            failures = self._outcomes.count(False)
+            if failures / len(self._outcomes) >= self.failure_threshold:
+                self._open_until = time.monotonic() + self.cooldown
+                self._outcomes.clear()
+                self.trips += 1
+                print(f"Error rate too high; pausing model calls for {self.cooldown:.0f}s")
+
+class ResilientCaller:
+    """
+    Run model calls with retries, exponential backoff with jitter, a retry budget
+    and a shared circuit breaker.
+
+    Args:
+        max_attempts: Maximum attempts per call (including the first)
+        base_delay: Backoff delay before the first retry, in seconds
+        max_delay: Upper bound for a single backoff delay, in seconds
+        retry_budget: Maximum number of retries across all calls (None for unlimited)
+        breaker: Circuit breaker shared by all callers (None to disable)
+    """
+
+    def __init__(self, max_attempts: int = 5, base_delay: float = 1.0, max_delay: float = 30.0,
+                 retry_budget: Optional[int] = None, breaker: Optional[CircuitBreaker] = None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_budget = retry_budget
+        self.breaker = breaker
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.fatal_errors = 0
+        self._lock = threading.Lock()
+
+    def _take_retry(self) -> bool:
+        with self._lock:
+            if self.retry_budget is not None and self.retries >= self.retry_budget:
+                return False
+            self.retries += 1
+            return True
+
+    def call(self, func: Callable[[], Any]) -> Any:
+        """
+        Call func, retrying transient failures.
+
+        Raises:
+            The last exception if the failure is not retryable, attempts are
+            exhausted or the retry budget is spent
+        """
+        with self._lock:
+            self.calls += 1
+        for attempt in range(self.max_attempts):
+            if self.breaker is not None:
+                self.breaker.wait()
+            try:
+                result = func()
+            except Exception as e:
+                if self.breaker is not None:
+                    self.breaker.record(False)
+                retryable = is_retryable(e)
+                with self._lock:
+                    self.failures += 1
+                    if is_fatal(e):
+                        self.fatal_errors += 1
+                if not retryable or attempt == self.max_attempts - 1 or not self._take_retry():
+                    raise
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                time.sleep(delay)
+                continue
+            if self.breaker is not None:
+                self.breaker.record(True)
+            return result
+
+    def summary(self) -> str:
+        """Return a one-line summary of the call counters."""
+        trips = self.breaker.trips if self.breaker is not None else 0
+        return (f"Model calls: {self.calls}, retries: {self.retries}, failed attempts: {self.failures}, "
+                f"fatal errors: {self.fatal_errors}, circuit breaker trips: {trips}")
@@ -0,0 +1,107 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Default location of the on-disk response cache
+DEFAULT_CACHE_DIR = ".mcq_cache"
+
+class ResponseCache:
+    """
+    On-disk cache of model responses backed by SQLite.
+
+    Entries are keyed by a hash of the model name, the full prompt and the
+    generation parameters. Entries older than max_age_days are dropped, and when
+    the cache grows beyond max_bytes the least recently used entries are evicted.
+    The total size is read once when the cache is opened and kept up to date
+    on every write, so a put never scans the whole table.
+
+    Args:
+        cache_dir: Directory holding the cache database
+        max_bytes: Maximum total size of cached responses
+        max_age_days: Maximum age of an entry before it is discarded
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR, max_bytes: int = 100 * 1024 * 1024,
+                 max_age_days: float = 30):
+        os.makedirs(cache_dir, exist_ok=True)
+        self.path = os.path.join(cache_dir, "responses.sqlite3")
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 24 * 3600
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+            " created REAL NOT NULL, accessed REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+        self._conn.commit()
+        self._total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(model_name: str, prompt: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Return the cache key for a model call."""
+        payload = json.dumps([model_name, prompt, params or {}], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response text for key, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        """Store a response and evict expired or least recently used entries."""
+        now = time.time()
+        size = len(value.encode("utf-8"))
+        with self._lock:
+            row = self._conn.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created, accessed) VALUES (?, ?, ?, ?, ?)",
+                (key, value, size, now, now)
+            )
+            self._total += size - (row[0] if row else 0)
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        # Both lookups use an index and only touch the rows being removed
+        cutoff = now - self.max_age
+        expired = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses WHERE created < ?",
+                                     (cutoff,)).fetchone()[0]
+        if expired:
+            self._conn.execute("DELETE FROM responses WHERE created < ?", (cutoff,))
+            self._total -= expired
+        if self._total <= self.max_bytes:
+            return
+        excess = self._total - self.max_bytes
+        freed = 0
+        stale = []
+        for key, size in self._conn.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+        self._total -= freed
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
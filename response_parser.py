@@ -0,0 +1,234 @@
+import json
+import re
+from typing import Any, List
+
+# Typographic quotes models sometimes use in place of JSON string delimiters
+SMART_OPEN_QUOTES = "“„"
+SMART_CLOSE_QUOTES = "”“"
+
+# Characters the scanner stops at in each state
+_VALUE_START = re.compile(r"[{\[]")
+_STRUCTURAL = re.compile(r'[{}\[\]"“„]')
+_STRING_END = re.compile(r'[\\"]')
+_SMART_STRING_END = re.compile(r'[\\"”“]')
+
+class JsonStreamExtractor:
+    """
+    Pull complete top-level JSON objects and arrays out of free-form model output.
+
+    Text is scanned once, jumping between structural characters, and can be fed
+    in chunks as a streamed response arrives; each value is parsed as soon as
+    its closing bracket is seen. Surrounding prose and markdown fences are skipped. Common
+    defects are repaired before parsing: trailing commas before a closing
+    bracket and typographic quotes used as string delimiters. A candidate that
+    still fails to parse (e.g. a stray brace in the prose) is dropped and the
+    scan resumes just after its opening bracket, so a valid value later in the
+    text, or valid values nested inside a broken one, are still recovered.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard all buffered text and extracted values."""
+        self.values: List[Any] = []
+        # Buffered text as a list of chunks; positions below are absolute offsets in the response
+        self._chunks: List[str] = []
+        self._offset = 0
+        self._end = 0
+        self._pos = 0
+        self._start = -1
+        self._depth = 0
+        self._string_close = ""
+        self._fixes: List[tuple] = []
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Scan another chunk of text.
+
+        Only the new text is scanned. Chunks are buffered as a list while a
+        value is open and joined once when it completes, so streaming a large
+        value in small chunks stays linear in its size.
+
+        Args:
+            chunk: Next piece of the response
+
+        Returns:
+            Values completed by this chunk (also appended to self.values)
+        """
+        previous_end = self._end
+        self._chunks.append(chunk)
+        self._end += len(chunk)
+        if self._pos == previous_end:
+            text, base = chunk, previous_end
+        else:
+            # Resume from a position held back in an earlier chunk
+            text, base = self._buffer()[self._pos - self._offset:], self._pos
+        found = []
+        pos = 0
+        size = len(text)
+        while pos < size:
+            if self._start < 0:
+                # Looking for the start of a value
+                match = _VALUE_START.search(text, pos)
+                if match is None:
+                    pos = size
+                    break
+                self._begin(base + match.start())
+                pos = match.end()
+                continue
+
+            if self._string_close:
+                match = (_STRING_END if self._string_close == '"' else _SMART_STRING_END).search(text, pos)
+                if match is None:
+                    pos = size
+                    break
+                char = match.group()
+                pos = match.end()
+                if char == "\\":
+                    if pos == size:
+                        # Rescan the backslash once the escaped character arrives
+                        pos -= 1
+                        break
+                    pos += 1
+                elif char in self._string_close:
+                    if self._string_close != '"':
+                        self._fixes.append((base + match.start(), '"'))
+                    self._string_close = ""
+                else:
+                    # Plain quote inside a typographic-quoted string must be escaped
+                    self._fixes.append((base + match.start(), '\\"'))
+                continue
+
+            match = _STRUCTURAL.search(text, pos)
+            if match is None:
+                pos = size
+                break
+            char = match.group()
+            index = base + match.start()
+            pos = match.end()
+            if char == '"':
+                self._string_close = '"'
+            elif char in SMART_OPEN_QUOTES:
+                self._string_close = SMART_CLOSE_QUOTES
+                self._fixes.append((index, '"'))
+            elif char == "{" or char == "[":
+                self._depth += 1
+            else:
+                previous, previous_char = self._last_non_space(index)
+                if previous_char == ",":
+                    self._fixes.append((previous, ""))
+                self._depth -= 1
+                if self._depth == 0:
+                    value_start = self._start
+                    value = self._finish_value(index)
+                    if value is _INVALID:
+                        # Not JSON after all; rescan from just after the opening bracket
+                        base = value_start + 1
+                        text = self._buffer()[base - self._offset:]
+                        pos = 0
+                        size = len(text)
+                        continue
+                    found.append(value)
+
+        self._pos = base + pos
+        if self._start < 0:
+            # Nothing left to parse in the buffered text
+            self._chunks = []
+            self._offset = self._pos
+        else:
+            # Keep only the chunks holding the unfinished value
+            offset = self._offset
+            drop = 0
+            while offset + len(self._chunks[drop]) <= self._start:
+                offset += len(self._chunks[drop])
+                drop += 1
+            if drop:
+                del self._chunks[:drop]
+                self._offset = offset
+        self.values.extend(found)
+        return found
+
+    def finish(self) -> List[Any]:
+        """
+        Signal the end of the response.
+
+        An unterminated value is abandoned and the rest of its text rescanned
+        for complete values.
+
+        Returns:
+            All values extracted from the response
+        """
+        while self._start >= 0:
+            rest = self._buffer()[self._start + 1 - self._offset:]
+            self._chunks = []
+            self._offset = self._end = self._pos = 0
+            self._start = -1
+            self.feed(rest)
+        return self.values
+
+    def _buffer(self) -> str:
+        # Join the buffered chunks (once per completed value)
+        if len(self._chunks) > 1:
+            self._chunks[:] = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def _last_non_space(self, position: int) -> tuple:
+        # Position and character of the last non-whitespace character before position
+        index = position - 1
+        offset = self._end
+        for part in reversed(self._chunks):
+            offset -= len(part)
+            while index >= offset:
+                char = part[index - offset]
+                if not char.isspace():
+                    return index, char
+                index -= 1
+        return -1, ""
+
+    def _begin(self, pos: int) -> None:
+        self._start = pos
+        self._depth = 1
+        self._string_close = ""
+        self._fixes = []
+
+    def _finish_value(self, end: int):
+        start = self._start
+        self._start = -1
+        text = self._buffer()
+        offset = self._offset
+        candidate = text[start - offset:end - offset + 1]
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            pass
+        if not self._fixes:
+            return _INVALID
+        pieces = []
+        previous = start
+        for index, replacement in sorted(self._fixes):
+            pieces.append(text[previous - offset:index - offset])
+            pieces.append(replacement)
+            previous = index + 1
+        pieces.append(text[previous - offset:end - offset + 1])
+        try:
+            return json.loads("".join(pieces))
+        except ValueError:
+            return _INVALID
+
+# Marker for a candidate that could not be parsed
+_INVALID = object()
+
+def extract_json_values(text: str) -> List[Any]:
+    """
+    Return every complete top-level JSON object or array found in text.
+
+    Args:
+        text: Model response text
+
+    Returns:
+        Extracted values in the order they appear
+    """
+    extractor = JsonStreamExtractor()
+    extractor.feed(text)
+    return extractor.finish()